@@ -1,11 +1,16 @@
 # Dashclim.py
 import re
 import io
+import gzip
+import json
 import math
-from typing import Optional, Tuple, Dict
+import textwrap
+import functools
+from typing import Optional, Tuple, Dict, NamedTuple
 import pandas as pd
 import folium
 from folium import plugins
+from jinja2 import Template
 import numpy as np
 import streamlit as st
 import plotly.express as px
@@ -13,6 +18,8 @@ import html
 import streamlit.components.v1 as components
 from folium import Map, CircleMarker, Popup
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 
 
 
@@ -48,21 +55,206 @@ USE_SERVICE_ACCOUNT = False  # toggle to True only if you will configure st.secr
 # --------------------------
 #  HELPERS: Google Sheet loader
 # --------------------------
+# Precompiled patterns (hindari re-compile/lookup per call pada loop parsing)
+_RE_SHEET_ID = re.compile(r"/d/([a-zA-Z0-9-_]+)")
+_RE_GID = re.compile(r"#?gid=([0-9]+)")
+# Satu pattern alternation: engine jalan satu kali sepanjang string,
+# bukan empat scan terpisah per unit (hari/jam/menit/detik).
+_RE_DELTA = re.compile(
+    r"(?:(?P<d>-?\s*\d+)\s*hari)"
+    r"|(?:(?P<h>-?\s*\d+)\s*jam)"
+    r"|(?:(?P<m>-?\s*\d+)\s*(?:mnt|min))"
+    r"|(?:(?P<s>-?\s*\d+)\s*(?:dtk|sec|s))",
+    re.I,
+)
+_RE_NONDIGIT = re.compile(r"\D")
+_RE_NUM = re.compile(r"(-?\d+(?:\.\d+)?)")
+# Pattern per unit untuk jalur vectorized (str.extract menerima pattern
+# terkompilasi — hindari re-compile di tiap panggilan parse_delta_column)
+_RE_DELTA_DAYS = re.compile(r"(-?\s*\d+)\s*hari", re.I)
+_RE_DELTA_HOURS = re.compile(r"(-?\s*\d+)\s*jam", re.I)
+_RE_DELTA_MINS = re.compile(r"(-?\s*\d+)\s*(?:mnt|min)", re.I)
+_RE_DELTA_SECS = re.compile(r"(-?\s*\d+)\s*(?:dtk|sec|s)", re.I)
+
+# Frozenset untuk klasifikasi kolom worksheet (O(1) lookup / set-intersection)
+MONTH_PREFIXES = frozenset(['jan','feb','mar','apr','mei','jun','jul','agt','sep','okt','nov','des'])
+
+# html.escape ter-vectorize untuk matriks cell tabel (satu pass C-loop numpy)
+_ESCAPE_CELLS = np.vectorize(html.escape, otypes=[object])
+
+def _table_fingerprint(df: pd.DataFrame) -> tuple:
+    """Fingerprint murah DataFrame untuk cache key (shape + kolom + content hash)."""
+    return (df.shape, tuple(str(c) for c in df.columns),
+            int(pd.util.hash_pandas_object(df, index=False).sum()))
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _csv_bytes(fingerprint: tuple, _df: pd.DataFrame) -> bytes:
+    # fingerprint adalah cache key; _df (underscore) tidak di-hash Streamlit
+    return _df.to_csv(index=False).encode("utf-8")
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _csv_gz_bytes(fingerprint: tuple, _df: pd.DataFrame) -> bytes:
+    # CSV gzip untuk export besar: compresslevel=1 menjaga CPU tetap rendah
+    # sementara ukuran unduhan turun ~5-10x dibanding CSV mentah
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=1) as gz:
+        _df.to_csv(gz, index=False)
+    return buf.getvalue()
+
+# Colgroup widths map — sesuaikan jika perlu
+_TABLE_WIDTH_MAP = {
+    "Nama Stasiun": "40%",
+    "WMO ID": "8%",
+    "Bulan": "10%",
+    "Tahun-Bulan": "10%",
+    "Status": "12%",
+    "Diterima": "20%",
+    "Time Diff (jam)": "10%",
+    "time_diff_hours": "12%",
+}
+
+# CSS tabel dengan selector kelas stabil (.climat-table) — didaftarkan SEKALI
+# per halaman lewat st.markdown, bukan disisipkan ulang per tabel/iframe;
+# tiga tab berbagi satu blok <style> dan tidak ada parse CSS berulang
+_TABLE_CSS = """
+    <style>
+    /* container: fixed height, scroll inside */
+    .climat-table-wrap {
+        width: 100%;
+        max-width: 100%;
+        height: 420px;
+        overflow: auto;
+        border: 1px solid #e6eef3;
+        border-radius: 6px;
+        background: #ffffff;
+    }
+    table.climat-table {
+        width: 100%;
+        border-collapse: collapse;
+        table-layout: fixed; /* respect col widths but allow wrapping */
+        font-family: "Segoe UI", Roboto, Arial, sans-serif;
+    }
+    table.climat-table thead th {
+        position: sticky;
+        top: 0;
+        background: #ffffff;
+        z-index: 5;
+        text-align: left;
+        padding: 12px 14px;
+        border-bottom: 1px solid #e6eef3;
+        font-weight: 600;
+        color: #243447;
+    }
+    table.climat-table tbody td {
+        padding: 10px 14px;
+        border-bottom: 1px solid #f2f7fa;
+        /* allow wrapping and long-word break */
+        white-space: normal;
+        word-wrap: break-word;
+        overflow-wrap: anywhere;
+        hyphens: auto;
+        vertical-align: top;
+    }
+    table.climat-table tbody tr:nth-child(odd) {
+        background: #fbfeff;
+    }
+    table.climat-table tbody tr:hover {
+        background: #e8f6fb;
+    }
+    /* Nama Stasiun prefer wide, but allow wrap if needed */
+    table.climat-table td:first-child {
+        min-width: 240px;
+        max-width: 60%;
+    }
+    /* make other columns flexible */
+    table.climat-table td:nth-child(2) { text-align:center; }
+    /* small screens adjustments */
+    @media (max-width: 900px) {
+        .climat-table-wrap { height: 300px; }
+        table.climat-table thead th, table.climat-table tbody td {
+            padding: 8px;
+            font-size: 13px;
+        }
+    }
+    </style>
+    """
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _monthly_table_html(fingerprint: tuple, _df: pd.DataFrame) -> str:
+    """
+    Bangun string HTML tabel (thead + tbody, tanpa CSS — stylenya dipasang
+    sekali per halaman) sekali per fingerprint; repaint/tab-switch
+    berikutnya memakai string hasil cache.
+    """
+    df_show = _df
+    cols = list(df_show.columns)
+
+    colgroup = "<colgroup>{}</colgroup>".format(
+        "".join(f'<col style="width:{_TABLE_WIDTH_MAP.get(c, "auto")}">' for c in cols))
+
+    # Pipeline kolumnar numpy: escape, bungkus <td>, dan gabung per baris
+    # semuanya lewat np.char — pandas to_html masih menjalankan formatter
+    # Python per cell, jalur ini tidak
+    thead_cells = "".join(f"<th>{html.escape(str(c))}</th>" for c in cols)
+    arr = df_show.to_numpy(dtype=object)
+    arr[pd.isna(arr)] = ""
+    esc = _ESCAPE_CELLS(arr.astype(str)).astype(str)
+    tds = np.char.add(np.char.add("<td>", esc), "</td>")
+    row_strs = tds[:, 0]
+    for j in range(1, tds.shape[1]):
+        row_strs = np.char.add(row_strs, tds[:, j])
+    rows_full = np.char.add(np.char.add("<tr>", row_strs), "</tr>")
+    tbody_html = "\n".join(rows_full.tolist())
+
+    table_html = f"""
+    <div class="climat-table-wrap">
+    <table class="climat-table">
+        {colgroup}
+        <thead><tr>{thead_cells}</tr></thead>
+        <tbody>
+        {tbody_html}
+        </tbody>
+    </table>
+    </div>
+    """
+
+    # Render HTML with scrolling area
+    return table_html
+
+@functools.lru_cache(maxsize=4096)
+def wrap_text_for_title(s: str, max_chars: int = 40) -> str:
+    """
+    Wrap text by inserting <br> at whitespace so the title fits in two (or more) lines.
+    Keeps words intact; hasil di-cache karena nama stasiun berulang antar halaman.
+    """
+    s = str(s).strip()
+    return "<br>".join(textwrap.wrap(s, width=max_chars, break_long_words=False,
+                                     break_on_hyphens=False)) or s
+
+# Kode int8 untuk status bulanan: matriks bulan jadi buffer int8 kontigu
+# (~20x lebih kecil dari object-string) dan perbandingan == jalan SIMD-width.
+_STATUS_CODE = {'TIDAK MENGIRIM': 0, 'TERLAMBAT': 1, 'TEPAT WAKTU': 2}
+
+def status_code_matrix(df: pd.DataFrame, month_cols) -> np.ndarray:
+    """Matriks int8 (rows x months) dari kolom status ternormalisasi; -1 = lainnya."""
+    return np.stack(
+        [df[c].map(_STATUS_CODE).fillna(-1).astype(np.int8).to_numpy() for c in month_cols],
+        axis=1,
+    )
+_SUMMARY_COLS = frozenset(['tepat_waktu','terlambat','tidak_mengirim'])
+_STATION_COLS = frozenset(['station_name','nama stasiun','stasiun'])
+
 def extract_sheet_id_and_gid(url_or_id: str) -> Tuple[Optional[str], Optional[str]]:
     if not url_or_id:
         return None, None
-    m = re.search(r"/d/([a-zA-Z0-9-_]+)", url_or_id)
+    m = _RE_SHEET_ID.search(url_or_id)
     sheet_id = None
     gid = None
     if m:
         sheet_id = m.group(1)
-        mg = re.search(r"gid=([0-9]+)", url_or_id)
+        mg = _RE_GID.search(url_or_id)
         if mg:
             gid = mg.group(1)
-        else:
-            mg = re.search(r"#gid=([0-9]+)", url_or_id)
-            if mg:
-                gid = mg.group(1)
     else:
         if "," in url_or_id:
             parts = url_or_id.split(",")
@@ -76,12 +268,30 @@ def extract_sheet_id_and_gid(url_or_id: str) -> Tuple[Optional[str], Optional[st
 
 def gsheet_csv_export_url(sheet_id: str, gid: str = "0") -> str:
     return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+
+# Session dengan connection pool: TLS/keep-alive ke docs.google.com dipakai ulang
+# antar fetch CSV, tidak handshake baru per request.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+def _fetch_csv(url: str, usecols=None) -> pd.DataFrame:
+    resp = _SESSION.get(url, timeout=10)
+    resp.raise_for_status()
+    # pyarrow engine: parse ke Arrow buffer (lebih cepat & hemat RAM untuk kolom
+    # string); fallback ke C engine kalau pyarrow tidak terpasang / gagal parse.
+    try:
+        return pd.read_csv(io.StringIO(resp.text), engine="pyarrow",
+                           dtype_backend="pyarrow", usecols=usecols)
+    except Exception:
+        return pd.read_csv(io.StringIO(resp.text), usecols=usecols)
 #------------------------------------------------------------------------------
+@st.cache_data(ttl=3600, persist="disk", max_entries=16, show_spinner=False)
 def discover_gids_for_sheet(sheet_id: str, max_tries: int = 60) -> list:
     """
-    Try several heuristics to discover gids for a PUBLIC Google Spreadsheet:
-      1) fetch /docs.google.com/spreadsheets/d/{id} and regex for gid=
-      2) fetch /gviz/tq?tqx=out:json and regex for sheetId / gid
+    Discover gids for a PUBLIC Google Spreadsheet via one gviz/tq JSON request.
+    The response is JavaScript wrapping JSON; strip the setResponse(...) wrapper,
+    parse it and collect every "sheetId" value. A regex scan over the raw text is
+    kept as fallback in case the wrapper format shifts.
     Returns sorted list of unique gid strings (may be empty if sheet is private).
     """
     if not sheet_id:
@@ -89,36 +299,43 @@ def discover_gids_for_sheet(sheet_id: str, max_tries: int = 60) -> list:
 
     gids = set()
 
-    # 1) naive HTML scrape (existing method) - quick attempt
+    gviz_url = (f"https://docs.google.com/spreadsheets/d/{sheet_id}"
+                "/gviz/tq?tqx=out:json&tq=SELECT%20*%20LIMIT%200")
+    txt = ""
     try:
-        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}"
-        resp = requests.get(url, timeout=6)
+        resp = _SESSION.get(gviz_url, timeout=6)
         if resp.status_code == 200 and resp.text:
-            found = re.findall(r"gid=([0-9]+)", resp.text)
-            for g in found:
-                gids.add(str(int(g)))  # normalize
+            txt = resp.text
     except Exception:
         pass
 
-    # 2) try gviz JSON endpoint (works on many public sheets)
-    # The response is JavaScript that wraps JSON; we extract numbers like "sheetId":123456789
-    try:
-        gviz_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:json"
-        resp = requests.get(gviz_url, timeout=6)
-        if resp.status_code == 200 and resp.text:
-            txt = resp.text
-            # extract numeric sheetId occurrences
-            sheet_ids = re.findall(r'"sheetId"\s*:\s*([0-9]+)', txt)
-            for sid in sheet_ids:
+    if txt:
+        # strict path: unwrap google.visualization.Query.setResponse( ... );
+        try:
+            obj = json.loads(txt[txt.index("(") + 1:txt.rindex(")")])
+
+            def _collect_sheet_ids(o):
+                if isinstance(o, dict):
+                    for k, v in o.items():
+                        if k == "sheetId" and str(v).isdigit():
+                            gids.add(str(int(v)))
+                        else:
+                            _collect_sheet_ids(v)
+                elif isinstance(o, list):
+                    for v in o:
+                        _collect_sheet_ids(v)
+
+            _collect_sheet_ids(obj)
+        except Exception:
+            pass
+        # fallback: regex over the raw payload for sheetId / gid numbers
+        if not gids:
+            for sid in re.findall(r'"sheetId"\s*:\s*([0-9]+)', txt):
                 gids.add(str(int(sid)))
-            # sometimes gviz contains "gid=NNN" too
-            found2 = re.findall(r"gid=([0-9]+)", txt)
-            for g in found2:
+            for g in re.findall(r"gid=([0-9]+)", txt):
                 gids.add(str(int(g)))
-    except Exception:
-        pass
 
-    # 3) fallback: try gid 0 (default) and some typical common gids used earlier
+    # last resort: try gid 0 (default) and some typical common gids used earlier
     if not gids:
         fallback = ["0", "172027705", "1493298409"]
         for f in fallback:
@@ -129,14 +346,14 @@ def discover_gids_for_sheet(sheet_id: str, max_tries: int = 60) -> list:
     return sorted_gids
 #------------------------------------------------------------------------------
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, persist="disk", max_entries=32, show_spinner=False)
 def load_sheet_csv_url(url_or_id: str) -> pd.DataFrame:
     sheet_id, gid = extract_sheet_id_and_gid(url_or_id)
     if not sheet_id:
         raise ValueError("Tidak dapat mengekstrak sheet id.")
     csv_url = gsheet_csv_export_url(sheet_id, gid)
     try:
-        df = pd.read_csv(csv_url)
+        df = _fetch_csv(csv_url)
         return df
     except Exception as e:
         raise RuntimeError(f"Gagal memuat CSV dari URL: {csv_url}. Error: {e}")
@@ -156,34 +373,51 @@ def parse_delta_to_hours(text: str) -> Optional[float]:
         sign = -1
     elif s.startswith("+"):
         sign = 1
-    days = hours = mins = secs = 0
-    m_day = re.search(r"(-?\s*\d+)\s*hari", s, flags=re.I)
-    if m_day:
-        try:
-            days = int(re.sub(r"\D", "", m_day.group(1)))
-        except:
-            days = 0
-    m_hour = re.search(r"(-?\s*\d+)\s*jam", s, flags=re.I)
-    if m_hour:
-        try:
-            hours = int(re.sub(r"\D", "", m_hour.group(1)))
-        except:
-            hours = 0
-    m_min = re.search(r"(-?\s*\d+)\s*(mnt|min)", s, flags=re.I)
-    if m_min:
-        try:
-            mins = int(re.sub(r"\D", "", m_min.group(1)))
-        except:
-            mins = 0
-    m_sec = re.search(r"(-?\s*\d+)\s*(dtk|sec|s)", s, flags=re.I)
-    if m_sec:
+    units = {}
+    for mo in _RE_DELTA.finditer(s):
+        grp = mo.lastgroup
+        if grp in units:
+            continue  # pakai kemunculan pertama per unit (sama seperti re.search)
         try:
-            secs = int(re.sub(r"\D", "", m_sec.group(1)))
+            units[grp] = int(_RE_NONDIGIT.sub("", mo.group(grp)))
         except:
-            secs = 0
+            units[grp] = 0
+    days = units.get("d", 0)
+    hours = units.get("h", 0)
+    mins = units.get("m", 0)
+    secs = units.get("s", 0)
     total_hours = days*24 + hours + mins/60.0 + secs/3600.0
     return sign * float(total_hours)
 
+def parse_delta_column(series: pd.Series) -> pd.Series:
+    """
+    Versi vectorized parse_delta_to_hours untuk satu kolom penuh:
+    ekstraksi unit jalan di C via Series.str.extract, bukan loop Python per baris.
+    Baris kosong / NaN menghasilkan NaN (padanan return None di versi scalar).
+    """
+    s = series.astype(str).str.strip()
+    empty = series.isna() | (s == "") | (s == "nan")
+    s = (s.str.replace("–", "-", regex=False)
+          .str.replace("—", "-", regex=False)
+          .str.replace("hrs", "jam", regex=False)
+          .str.replace("hr", "hari", regex=False))
+    sign = np.where(s.str.startswith("-"), -1.0, 1.0)
+
+    def _unit(rx) -> np.ndarray:
+        raw = s.str.extract(rx, expand=False)
+        return pd.to_numeric(raw.str.replace(_RE_NONDIGIT, "", regex=True),
+                             errors="coerce").fillna(0).to_numpy()
+
+    days = _unit(_RE_DELTA_DAYS)
+    hours = _unit(_RE_DELTA_HOURS)
+    mins = _unit(_RE_DELTA_MINS)
+    secs = _unit(_RE_DELTA_SECS)
+
+    # kombinasi aritmetika di numpy — satu buffer hasil, tanpa Series antara
+    total = pd.Series(sign * (days*24 + hours + mins/60.0 + secs/3600.0),
+                      index=series.index)
+    return total.mask(empty)
+
 # --------------------------
 #  DATA LOADER WRAPPER
 # --------------------------
@@ -214,7 +448,7 @@ def parse_delta_to_hours(text: str) -> Optional[float]:
 #     for k in ["deltahours","status","monthlysummary"]:
 #         out.setdefault(k, pd.DataFrame())
 #     return out
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, persist="disk", max_entries=32, show_spinner=False)
 def load_all_data(monthly_url: str, yearly_url: str, delta_gid: str=None, status_gid: str=None, monthly_summary_gid: str=None) -> Dict[str, pd.DataFrame]:
     """
     Load monthly and yearly sheets. If specific gids are given (delta_gid/status_gid/monthly_summary_gid), use them.
@@ -243,16 +477,17 @@ def load_all_data(monthly_url: str, yearly_url: str, delta_gid: str=None, status
     def try_load_and_classify(gid_str):
         url = gsheet_csv_export_url(sheet_id_y, gid_str)
         try:
-            df = pd.read_csv(url)
+            df = _fetch_csv(url)
         except Exception:
             return None, None
-        # normalize column names for heuristics
-        cols = [str(c).strip().lower() for c in df.columns]
+        # normalize column names once into a frozenset (O(1) membership,
+        # set-intersection menggantikan rescan any(...) per keyword)
+        cols_set = frozenset(str(c).strip().lower() for c in df.columns)
         # heuristics: check for presence of month cols or keyword columns
-        if any(c in cols for c in ['tepat_waktu','terlambat','tidak_mengirim']) and 'bulan' in cols:
+        if cols_set & _SUMMARY_COLS and 'bulan' in cols_set:
             return 'monthlysummary', df
-        if 'station_name' in cols or 'nama stasiun' in cols or 'stasiun' in cols:
-            month_like = [c for c in df.columns if str(c).strip()[:3].lower() in ['jan','feb','mar','apr','mei','jun','jul','agt','sep','okt','nov','des']]
+        if cols_set & _STATION_COLS:
+            month_like = [c for c in df.columns if str(c).strip()[:3].lower() in MONTH_PREFIXES]
             if month_like:
                 # peek first non-null cell in a month column
                 sample_val = None
@@ -266,17 +501,21 @@ def load_all_data(monthly_url: str, yearly_url: str, delta_gid: str=None, status
                 if sample_val is not None and any(k in str(sample_val).lower() for k in ['hari','jam','mnt','dtk','detik']):
                     return 'deltahours', df
                 return 'status', df
-        if 'bulan' in cols and any('tepat' in c for c in cols):
+        if 'bulan' in cols_set and any('tepat' in c for c in cols_set):
             return 'monthlysummary', df
         return None, df
 
-    # 1) If user provided specific gids, load those directly
-    for name, gid in provided.items():
-        try:
-            df = pd.read_csv(gsheet_csv_export_url(sheet_id_y, gid))
-            out[name] = df
-        except Exception:
-            out[name] = pd.DataFrame()
+    # 1) If user provided specific gids, load those directly (parallel; I/O bound)
+    if provided:
+        def _load_one(item):
+            name, gid = item
+            try:
+                return name, _fetch_csv(gsheet_csv_export_url(sheet_id_y, gid))
+            except Exception:
+                return name, pd.DataFrame()
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            for name, df in ex.map(_load_one, provided.items()):
+                out[name] = df
 
     # 2) If some targets are still empty, attempt discover
     needed = [k for k,v in out.items() if k in ['deltahours','status','monthlysummary'] and (v is None or v.empty)]
@@ -285,7 +524,8 @@ def load_all_data(monthly_url: str, yearly_url: str, delta_gid: str=None, status
         # ensure we always include base_gid if present and not already in list
         if base_gid and base_gid not in discovered:
             discovered.insert(0, base_gid)
-        # try each discovered gid and classify
+        # try each discovered gid and classify; satu fetch per gid, berhenti
+        # segera begitu ketiga target terisi (hemat download CSV yang tersisa)
         tried = set()
         for gid in discovered:
             if not needed:
@@ -294,26 +534,33 @@ def load_all_data(monthly_url: str, yearly_url: str, delta_gid: str=None, status
                 continue
             tried.add(gid)
             cls, df_try = try_load_and_classify(gid)
-            if cls and (out.get(cls) is None or out.get(cls).empty):
-                out[cls] = df_try
-                if cls in needed:
-                    needed.remove(cls)
-            else:
-                # fallback heuristic assign to deltahours if looks like durations
-                if (out.get('deltahours') is None or out.get('deltahours').empty):
-                    cols_lower = [c.lower() for c in df_try.columns]
-                    month_like = [c for c in df_try.columns if str(c).strip()[:3].lower() in ['jan','feb','mar','apr','mei','jun','jul','agt','sep','okt','nov','des']]
-                    if 'station_name' in cols_lower and month_like:
-                        sample_val = None
-                        for c in month_like:
-                            v = df_try[c].dropna().astype(str)
-                            if len(v)>0:
-                                sample_val = v.iloc[0]
-                                break
-                        if sample_val and any(k in str(sample_val).lower() for k in ['hari','jam','mnt','dtk','detik']):
-                            out['deltahours'] = df_try
-                            if 'deltahours' in needed:
-                                needed.remove('deltahours')
+            if df_try is None:
+                continue  # fetch gagal; jangan jalankan heuristik di atas None
+            if cls:
+                if out.get(cls) is None or out.get(cls).empty:
+                    out[cls] = df_try
+                    if cls in needed:
+                        needed.remove(cls)
+                        if not needed:
+                            break
+                continue
+            # classifier tidak yakin -> fallback heuristic deltahours jika
+            # terlihat seperti durasi (pakai df_try yang sama, tanpa fetch ulang)
+            if 'deltahours' in needed:
+                cols_lower = [c.lower() for c in df_try.columns]
+                month_like = [c for c in df_try.columns if str(c).strip()[:3].lower() in MONTH_PREFIXES]
+                if 'station_name' in cols_lower and month_like:
+                    sample_val = None
+                    for c in month_like:
+                        v = df_try[c].dropna().astype(str)
+                        if len(v)>0:
+                            sample_val = v.iloc[0]
+                            break
+                    if sample_val and any(k in str(sample_val).lower() for k in ['hari','jam','mnt','dtk','detik']):
+                        out['deltahours'] = df_try
+                        needed.remove('deltahours')
+                        if not needed:
+                            break
 
     # final ensure keys present
     for k in ['deltahours','status','monthlysummary']:
@@ -325,28 +572,111 @@ def load_all_data(monthly_url: str, yearly_url: str, delta_gid: str=None, status
 # --------------------------
 #  PLOTTING HELPERS
 # --------------------------
+# Konstanta peta: tile Esri + legend HTML statis, dibangun sekali di import
+ESRI_TILES = "https://server.arcgisonline.com/ArcGIS/rest/services/World_Street_Map/MapServer/tile/{z}/{y}/{x}"
+ESRI_ATTR = "Tiles &copy; Esri &mdash; Source: Esri, HERE, Garmin, NGA, USGS"
+
+LEGEND_MONTHLY_HTML = """
+<div style="
+    position: fixed;
+    bottom: 18px;
+    left: 18px;
+    width:200px;
+    background-color: white;
+    border:1px solid grey;
+    z-index:9999;
+    padding:8px 10px;
+    font-size:12px;
+">
+<b>Ketepatan Waktu</b><br>
+<span style="display:inline-block;width:12px;height:12px;background:#09ba53;margin-right:6px;"></span> Tepat Waktu<br>
+<span style="display:inline-block;width:12px;height:12px;background:#ff8c00;margin-right:6px;"></span> Terlambat<br>
+<span style="display:inline-block;width:12px;height:12px;background:#000000;margin-right:6px;"></span> Tidak Mengirim
+</div>
+"""
+
+LEGEND_YEARLY_HTML = """
+<div style="position:absolute;top:10px;right:10px;z-index:9999;
+            background:rgba(255,255,255,0.95);padding:8px;border-radius:6px;
+            border:1px solid #ddd;font-size:13px;">
+    <b>Keterangan</b><br>
+    <span style="background:#2ecc71;width:12px;height:12px;display:inline-block;margin-right:6px;"></span> ≥80% Tepat Waktu<br>
+    <span style="background:#f1c40f;width:12px;height:12px;display:inline-block;margin-right:6px;"></span> 30–79% Tepat Waktu<br>
+    <span style="background:#e74c3c;width:12px;height:12px;display:inline-block;margin-right:6px;"></span> <30% (Terlambat > Tidak)<br>
+    <span style="background:#000;width:12px;height:12px;display:inline-block;margin-right:6px;"></span> <30% (Terlambat ≤ Tidak)
+</div>
+"""
+
+class BulkCircleMarkers(folium.MacroElement):
+    """
+    Render banyak CircleMarker lewat satu loop JS client-side.
+    Data dikirim sekali sebagai array JSON [[lat, lon, color, popup_html], ...]
+    sehingga HTML peta tidak tumbuh satu snippet JS per marker.
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var data_{{ this.get_name() }} = {{ this.data }};
+        var fg_{{ this.get_name() }} = L.featureGroup().addTo({{ this._parent.get_name() }});
+        for (var i = 0; i < data_{{ this.get_name() }}.length; i++) {
+            var d = data_{{ this.get_name() }}[i];
+            L.circleMarker([d[0], d[1]], {
+                radius: {{ this.radius }},
+                color: d[2],
+                fill: true,
+                fillColor: d[2],
+                fillOpacity: 1,
+                weight: 1
+            }).bindPopup(d[3], {maxWidth: 320}).addTo(fg_{{ this.get_name() }});
+        }
+        {% endmacro %}
+    """)
+
+    def __init__(self, points, radius=6):
+        super().__init__()
+        self._name = "BulkCircleMarkers"
+        self.data = json.dumps([list(p) for p in points])
+        self.radius = radius
+
+
+@st.cache_data(ttl=300, max_entries=2, show_spinner=False)
+def build_monthly_map_html(points: tuple, center: tuple) -> str:
+    """
+    Bangun HTML peta bulanan sekali per isi data; rerun berikutnya cukup cache hit
+    pada tuple points (hashable) alih-alih membangun ulang map + N marker.
+    """
+    m = folium.Map(location=list(center), zoom_start=5, tiles=None)
+    folium.TileLayer(tiles=ESRI_TILES, attr=ESRI_ATTR, name="Esri World Street").add_to(m)
+    BulkCircleMarkers(points, radius=6).add_to(m)
+
+    # Legend sederhana (HTML overlay)
+    m.get_root().html.add_child(folium.Element(LEGEND_MONTHLY_HTML))
+    return m._repr_html_()
+
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False,
+               hash_funcs={pd.DataFrame: lambda d: pd.util.hash_pandas_object(d).sum()})
 def plot_monthly_stacked(df_monthly: pd.DataFrame):
     month_order = ["Jan","Feb","Mar","Apr","Mei","Jun","Jul","Agt","Sep","Okt","Nov","Des"]
-    if 'Bulan' in df_monthly.columns:
-        df = df_monthly.copy()
+    df = df_monthly.copy()
+    if 'Bulan' in df.columns:
         df['Bulan'] = pd.Categorical(df['Bulan'], categories=month_order, ordered=True)
         df = df.sort_values('Bulan')
-    else:
-        df = df_monthly.copy()
     cols = ['TEPAT_WAKTU','TERLAMBAT','TIDAK_MENGIRIM']
     existing = [c for c in cols if c in df.columns]
     if not existing:
         return None
-    row_sums = df[existing].sum(axis=1).replace(0, np.nan)
-    df_perc = df.copy()
-    df_perc[existing] = df_perc[existing].div(row_sums, axis=0).fillna(0) * 100
-    df_melt = df_perc.melt(id_vars='Bulan', value_vars=existing, var_name='Kategori', value_name='Percent')
+    # Normalisasi persen langsung di numpy; px.bar wide-form, tanpa melt
+    vals = df[existing].to_numpy(dtype=float)
+    row_sums = vals.sum(axis=1, keepdims=True)
+    row_sums[row_sums == 0] = np.nan
+    df[existing] = np.nan_to_num(vals / row_sums * 100)
     label_map = {'TEPAT_WAKTU':'Tepat Waktu','TERLAMBAT':'Terlambat','TIDAK_MENGIRIM':'Tidak Mengirim'}
-    df_melt['Label'] = df_melt['Kategori'].map(label_map).fillna(df_melt['Kategori'])
+    df = df.rename(columns=label_map)
     color_map = {'Tepat Waktu':'#2ecc71','Terlambat':'#f1c40f','Tidak Mengirim':'#e74c3c'}
-    fig = px.bar(df_melt, x='Bulan', y='Percent', color='Label',
+    fig = px.bar(df, x='Bulan', y=[label_map[c] for c in existing],
                  color_discrete_map=color_map,
-                 category_orders={'Bulan': month_order})
+                 category_orders={'Bulan': month_order},
+                 labels={'value': 'Percent', 'variable': 'Label'})
     fig.update_layout(barmode='stack', yaxis=dict(range=[0,100], title='Percent'), template='simple_white', height=420)
     fig.update_xaxes(tickangle=-45)
     return fig
@@ -485,6 +815,12 @@ def detect_status_column(df: pd.DataFrame) -> Optional[str]:
             candidates.append(cols[i])
     return candidates[0] if candidates else None
 
+# Fingerprint murah: shape + hash 50 baris pertama — stabil antar rerun
+# selama sheet yang sama dimuat, tanpa menghash seluruh frame.
+_df_fingerprint = lambda d: (d.shape, pd.util.hash_pandas_object(d.head(50)).sum())
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False,
+               hash_funcs={pd.DataFrame: _df_fingerprint})
 def normalize_monthly_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normalisasi df_monthly berdasarkan kolom:
@@ -499,46 +835,57 @@ def normalize_monthly_df(df: pd.DataFrame) -> pd.DataFrame:
 
     df2 = df.copy()
 
-    def to_bool(v):
-        """Convert Ya/Yes/True/1 ke True"""
-        if pd.isna(v):
-            return False
-        s = str(v).strip().upper()
-        return s in ["YA", "Y", "YES", "TRUE", "T", "1", "OK"]
+    _TRUE_SET = {"YA", "Y", "YES", "TRUE", "T", "1", "OK"}
+
+    def to_bool_col(col: pd.Series) -> np.ndarray:
+        """Convert kolom Ya/Yes/True/1 ke boolean array (vectorized, NaN -> False)."""
+        return col.astype(str).str.strip().str.upper().isin(_TRUE_SET).to_numpy()
 
     # Normalisasi kolom terkirim dan tepat_waktu jika ada
     if "terkirim" in df2.columns:
-        df2["terkirim_bool"] = df2["terkirim"].apply(to_bool)
+        terkirim = to_bool_col(df2["terkirim"])
     else:
-        df2["terkirim_bool"] = False
+        terkirim = np.zeros(len(df2), dtype=bool)
+    df2["terkirim_bool"] = terkirim
 
     if "tepat_waktu" in df2.columns:
-        df2["tepat_bool"] = df2["tepat_waktu"].apply(to_bool)
+        tepat = to_bool_col(df2["tepat_waktu"])
     else:
-        df2["tepat_bool"] = False
-
-    # Bentuk kolom status baru
-    def derive_status(row):
-        if not row["terkirim_bool"]:
-            return "TIDAK MENGIRIM"
-        if row["terkirim_bool"] and row["tepat_bool"]:
-            return "TEPAT WAKTU"
-        # kalau tidak tepat_waktu tapi ada info delta positif
-        if "time_diff_hours_num" in row and not pd.isna(row["time_diff_hours_num"]):
-            try:
-                val = float(row["time_diff_hours_num"])
-                if val > 0:
-                    return "TEPAT WAKTU"
-                else:
-                    return "TERLAMBAT"
-            except:
-                pass
-        return "TEPAT WAKTU"
+        tepat = np.zeros(len(df2), dtype=bool)
+    df2["tepat_bool"] = tepat
 
-    df2["status"] = df2.apply(derive_status, axis=1)
+    # Bentuk kolom status baru (vectorized, satu pass np.select)
+    if "time_diff_hours_num" in df2.columns:
+        td = pd.to_numeric(df2["time_diff_hours_num"], errors="coerce").to_numpy()
+    else:
+        td = np.full(len(df2), np.nan)
+
+    # kalau tidak tepat_waktu tapi ada info delta positif -> tetap TEPAT WAKTU
+    df2["status"] = np.select(
+        [~terkirim,
+         terkirim & tepat,
+         terkirim & ~tepat & (td > 0),
+         terkirim & ~tepat & (td <= 0)],
+        ["TIDAK MENGIRIM", "TEPAT WAKTU", "TEPAT WAKTU", "TERLAMBAT"],
+        default="TEPAT WAKTU",
+    )
+
+    # Kompres dtype: status jadi Categorical (kode int8, equality = int-compare),
+    # wmoid numerik bila memungkinkan, station_name ke Arrow string.
+    df2["status"] = pd.Categorical(df2["status"],
+                                   categories=["TEPAT WAKTU", "TERLAMBAT", "TIDAK MENGIRIM"])
+    if "wmoid" in df2.columns:
+        wmoid_num = pd.to_numeric(df2["wmoid"], errors="coerce")
+        if wmoid_num.notna().all():
+            df2["wmoid"] = wmoid_num
+    if "station_name" in df2.columns:
+        try:
+            df2["station_name"] = df2["station_name"].astype("string[pyarrow]")
+        except Exception:
+            pass
 
     # pastikan kolom tampil urut rapi
-    col_order = ["station_name", "wmoid", "LAT", "LON", "report_month", "status", 
+    col_order = ["station_name", "wmoid", "LAT", "LON", "report_month", "status",
                  "terkirim", "tepat_waktu", "time_diff_hours_num", "received_at", "monitoring_bulan"]
     df2 = df2[[c for c in col_order if c in df2.columns]]
 
@@ -549,6 +896,135 @@ def normalize_monthly_df(df: pd.DataFrame) -> pd.DataFrame:
     df2['status'] = 'TIDAK MENGIRIM'
     return df2
 
+class KpiCounts(NamedTuple):
+    total: int
+    tepat: int
+    terlambat: int
+    tidak: int
+    sent: int
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False,
+               hash_funcs={pd.Series: lambda s: (len(s), pd.util.hash_pandas_object(s.head(50)).sum())})
+def compute_kpis(status_series: pd.Series) -> KpiCounts:
+    """Hitung KPI status dengan satu value_counts (satu pass kolom, bukan 4 scan)."""
+    vc = status_series.value_counts()
+    total = len(status_series)
+    tidak = int(vc.get('TIDAK MENGIRIM', 0))
+    return KpiCounts(total=total,
+                     tepat=int(vc.get('TEPAT WAKTU', 0)),
+                     terlambat=int(vc.get('TERLAMBAT', 0)),
+                     tidak=tidak,
+                     sent=total - tidak)
+
+def ensure_time_diff_from_source(df_norm: pd.DataFrame, df_src: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pastikan kolom 'time_diff_hours' tersedia di df_norm:
+    - jika df_norm sudah punya, return langsung
+    - jika tidak, ambil dari df_src (sheet monthly) berdasarkan station_name,wmoid,report_month
+    """
+    if df_norm is None:
+        df_norm = pd.DataFrame()
+    if df_src is None:
+        df_src = pd.DataFrame()
+
+    # jangan copy di depan — itu menggandakan RSS untuk frame besar;
+    # copy baru dilakukan tepat sebelum kolom benar-benar ditulis
+    df_out = df_norm if not df_norm.empty else pd.DataFrame()
+
+    # jika sudah ada column time_diff_hours di normalized, kita gunakan itu
+    if "time_diff_hours" in df_out.columns and df_out["time_diff_hours"].notna().any():
+        return df_out
+
+    # kalau tidak ada, ambil dari source df_src (asumsi df_src berisi kolom time_diff_hours asli)
+    if "time_diff_hours" not in df_out.columns and not df_src.empty:
+        # pilih kolom kunci untuk merge
+        key_cols = []
+        for k in ["station_name","wmoid","report_month"]:
+            if k in df_out.columns and k in df_src.columns:
+                key_cols.append(k)
+        # jika df_out kosong (misalnya kita akan tunjukkan df_src langsung), set df_out = df_src subset
+        if df_out.empty:
+            # hanya dibaca; copy terjadi di guard bawah kalau perlu menulis
+            df_out = df_src
+        else:
+            df_out = df_out.copy()
+            # lookup lewat Series ter-index, bukan merge penuh — operasi ini
+            # cuma menarik satu nilai time_diff_hours per baris, tidak perlu
+            # hash table + buffer join untuk seluruh frame sumber
+            if key_cols:
+                try:
+                    lookup = df_src.drop_duplicates(subset=key_cols).set_index(key_cols)["time_diff_hours"]
+                    if len(key_cols) == 1:
+                        idx = pd.Index(df_out[key_cols[0]])
+                    else:
+                        idx = pd.MultiIndex.from_frame(df_out[key_cols])
+                    mapped = pd.Series(idx.map(lookup), index=df_out.index)
+                    if "time_diff_hours" in df_out.columns:
+                        df_out["time_diff_hours"] = df_out["time_diff_hours"].fillna(mapped)
+                    else:
+                        df_out["time_diff_hours"] = mapped
+                except Exception:
+                    # kalau lookup gagal, fallback: tambahkan kolom time_diff_hours kosong
+                    if "time_diff_hours" not in df_out.columns:
+                        df_out["time_diff_hours"] = "-"
+            else:
+                # tidak ada kolom kunci cocok -> fallback: tambahkan kolom dari src by index if lengths match
+                if len(df_out) == len(df_src):
+                    df_out["time_diff_hours"] = df_src.get("time_diff_hours", pd.Series(["-"]*len(df_out))).values
+                else:
+                    if "time_diff_hours" not in df_out.columns:
+                        df_out["time_diff_hours"] = "-"
+    # ensure column exists
+    if "time_diff_hours" not in df_out.columns:
+        df_out = df_out.copy()
+        df_out["time_diff_hours"] = "-"
+    return df_out
+
+@st.cache_data(ttl=300, max_entries=4, show_spinner=False,
+               hash_funcs={pd.DataFrame: _df_fingerprint})
+def prepare_display_df_for_table(df_norm: pd.DataFrame, df_src: pd.DataFrame) -> pd.DataFrame:
+    """
+    Siapkan DataFrame untuk ditampilkan:
+    - drop LAT,LON,time_diff_hours_num,tepat_waktu,monitoring_bulan
+    - pastikan time_diff_hours berasal dari source jika perlu
+    - rename header ke Bahasa Indonesia
+    Di-cache per fingerprint frame: rerun karena klik tab/widget tidak
+    mengulang deteksi kolom, lookup, dan rename.
+    """
+    if (df_norm is None or df_norm.empty) and (df_src is None or df_src.empty):
+        return pd.DataFrame()
+
+    # prefer df_norm, tapi gunakan df_src sebagai fallback — tanpa copy:
+    # drop/rename di bawah sudah mengembalikan frame baru
+    df_use = df_norm if not (df_norm is None or df_norm.empty) else df_src
+
+    # drop kolom yg tidak mau tampil
+    for c in ["LAT","LON","time_diff_hours_num","tepat_waktu","terkirim","monitoring_bulan"]:
+        if c in df_use.columns:
+            df_use = df_use.drop(columns=[c], errors='ignore')
+
+    # pastikan time_diff_hours muncul (ambil dari normalized atau source)
+    df_use = ensure_time_diff_from_source(df_use, df_src)
+
+    # susun kolom relevant
+    wanted = ["station_name","wmoid","report_month","status","received_at","time_diff_hours"]
+    cols_present = [c for c in wanted if c in df_use.columns]
+    other_cols = [c for c in df_use.columns if c not in cols_present]
+    df_res = df_use[cols_present + other_cols]
+
+    # rename column ke bahasa indonesia
+    rename_map = {
+        "station_name":"Nama Stasiun",
+        "wmoid":"WMO ID",
+        "report_month":"Tahun-Bulan",
+        "status":"Status",
+        "received_at":"Diterima",
+        "time_diff_hours":"Time Diff (jam)"
+    }
+    df_res = df_res.rename(columns={k:v for k,v in rename_map.items() if k in df_res.columns})
+
+    return df_res
+
 # Normalize monthly df once
 df_monthly_norm = normalize_monthly_df(df_monthly) if 'df_monthly' in globals() else pd.DataFrame()
 
@@ -576,14 +1052,11 @@ if main_page == "Last Month":
     col1.metric("Total Stasiun", total)
 
     if not df_monthly_norm.empty:
-        sent_count = (df_monthly_norm['status'] != 'TIDAK MENGIRIM').sum()
-        tepat = (df_monthly_norm['status'] == 'TEPAT WAKTU').sum()
-        terlambat = (df_monthly_norm['status'] == 'TERLAMBAT').sum()
-        tidak = (df_monthly_norm['status'] == 'TIDAK MENGIRIM').sum()
-        col2.metric("% Mengirim", f"{(sent_count/total*100):.0f}%")
-        col3.metric("% Tepat Waktu", f"{(tepat/total*100):.0f}%")
-        col4.metric("% Terlambat", f"{(terlambat/total*100):.0f}%")
-        col5.metric("% Tidak Mengirim", f"{(tidak/total*100):.0f}%")
+        kpi = compute_kpis(df_monthly_norm['status'])
+        col2.metric("% Mengirim", f"{(kpi.sent/total*100):.0f}%")
+        col3.metric("% Tepat Waktu", f"{(kpi.tepat/total*100):.0f}%")
+        col4.metric("% Terlambat", f"{(kpi.terlambat/total*100):.0f}%")
+        col5.metric("% Tidak Mengirim", f"{(kpi.tidak/total*100):.0f}%")
 
     else:
         col2.metric("% Mengirim", "0%")
@@ -596,400 +1069,177 @@ if main_page == "Last Month":
     # ---------- MAP FULL-WIDTH (atas) ----------
     st.subheader("Availability")
 
-    # tampilkan peta full-width (keluarkan dari st.columns)
-    if not df_monthly_norm.empty and {'LAT','LON','status'}.issubset(df_monthly_norm.columns):
-        import folium
-        from folium import Map, Marker, CircleMarker
-        try:
-            from streamlit_folium import st_folium
-            use_st_folium = True
-        except Exception:
-            use_st_folium = False
-            import streamlit.components.v1 as components
-
-        df_map = df_monthly_norm.copy()
-
-        # Esri tile URL (World Street Map)
-        esri_tiles = "https://server.arcgisonline.com/ArcGIS/rest/services/World_Street_Map/MapServer/tile/{z}/{y}/{x}"
-        esri_attr = "Tiles &copy; Esri &mdash; Source: Esri, HERE, Garmin, NGA, USGS"
-
-        # center map di rata-rata koordinat
-        try:
-            center_lat = -2.2331
-            center_lon = 117.2841
-            # center_lat = float(df_map['LAT'].astype(float).mean())
-            # center_lon = float(df_map['LON'].astype(float).mean())
-        except Exception:
-            center_lat, center_lon = -2.2331, 117.2841
-
-        m = folium.Map(location=[center_lat, center_lon], zoom_start=5, tiles=None)
-        folium.TileLayer(tiles=esri_tiles, attr=esri_attr, name="Esri World Street").add_to(m)
-
-        # warna hex untuk status
-        color_map_hex = {
-            "TEPAT WAKTU": "#09ba53",
-            "TERLAMBAT": "#ff8c00",
-            "TIDAK MENGIRIM": "#000000"
-        }
+    # Fragment: interaksi di dalam peta tidak memicu rerun seluruh script
+    @st.fragment
+    def render_map():
+        # tampilkan peta full-width (keluarkan dari st.columns)
+        if not df_monthly_norm.empty and {'LAT','LON','status'}.issubset(df_monthly_norm.columns):
+            df_map = df_monthly_norm
 
-        def fmt_time_diff(val):
+            # center map di rata-rata koordinat
             try:
-                if pd.isna(val):
-                    return "-"
-                v = float(val)
-                return f"{v:+.2f} jam"
-            except:
-                return str(val)
-
-        # Tambahkan markers TANPA clustering, radius tetap
-        FIXED_RADIUS = 6
-        for _, r in df_map.iterrows():
-            try:
-                lat = float(r['LAT'])
-                lon = float(r['LON'])
-            except:
-                continue
-            status = r.get('status', 'TIDAK MENGIRIM')
-            color = color_map_hex.get(status, "#999999")
-            td = fmt_time_diff(r.get('time_diff_hours_num', None))
-
-            popup_html = f"""
-            <div style="font-size:13px;">
-            <b>{r.get('station_name','-')}</b><br>
-            <small>WMO: {r.get('wmoid','-')}</small><br>
-            <small>Status: <strong>{status}</strong></small><br>
-            <small>Time diff: <code>{td}</code></small>
-            </div>
-            """
-
-            folium.CircleMarker(
-                location=[lat, lon],
-                radius=FIXED_RADIUS,
-                color=color,
-                fill=True,
-                fill_color=color,
-                fill_opacity=1,
-                weight=1,
-                popup=folium.Popup(popup_html, max_width=320)
-            ).add_to(m)
-
-        # Legend sederhana (HTML overlay)
-        legend_html = """
-        <div style="
-            position: fixed;
-            bottom: 18px;
-            left: 18px;
-            width:200px;
-            background-color: white;
-            border:1px solid grey;
-            z-index:9999;
-            padding:8px 10px;
-            font-size:12px;
-        ">
-        <b>Ketepatan Waktu</b><br>
-        <span style="display:inline-block;width:12px;height:12px;background:#09ba53;margin-right:6px;"></span> Tepat Waktu<br>
-        <span style="display:inline-block;width:12px;height:12px;background:#ff8c00;margin-right:6px;"></span> Terlambat<br>
-        <span style="display:inline-block;width:12px;height:12px;background:#000000;margin-right:6px;"></span> Tidak Mengirim
-        </div>
-        """
-        m.get_root().html.add_child(folium.Element(legend_html))
+                center_lat = -2.2331
+                center_lon = 117.2841
+                # center_lat = float(df_map['LAT'].astype(float).mean())
+                # center_lon = float(df_map['LON'].astype(float).mean())
+            except Exception:
+                center_lat, center_lon = -2.2331, 117.2841
+
+            # warna hex untuk status
+            color_map_hex = {
+                "TEPAT WAKTU": "#09ba53",
+                "TERLAMBAT": "#ff8c00",
+                "TIDAK MENGIRIM": "#000000"
+            }
 
-        # render map full-width
-        if use_st_folium:
-            # st_folium menerima width="100%" sehingga memenuhi lebar area Streamlit
-            st_folium(m, width="100%", height=470)
+            # Preprocess semua kolom sekali (vectorized) — hindari iterrows() yang
+            # mem-boxing satu Series per baris pada setiap rerun.
+            lats = pd.to_numeric(df_map['LAT'], errors='coerce').to_numpy()
+            lons = pd.to_numeric(df_map['LON'], errors='coerce').to_numpy()
+            statuses = df_map['status'].astype(str).to_numpy()
+            colors = df_map['status'].map(color_map_hex).fillna("#999999").to_numpy()
+            if 'time_diff_hours_num' in df_map.columns:
+                td_num = pd.to_numeric(df_map['time_diff_hours_num'], errors='coerce')
+                td_strs = np.where(td_num.notna(), td_num.map(lambda v: f"{v:+.2f} jam"), "-")
+            else:
+                td_strs = np.full(len(df_map), "-")
+            # Cast ke string dulu: kolom bisa numerik (mis. wmoid int64 dari
+            # reader pyarrow) dan fillna('-') langsung di situ melempar error
+            stations = df_map['station_name'].astype('string').fillna('-').astype(str).to_numpy() if 'station_name' in df_map.columns else np.full(len(df_map), '-')
+            wmoids = df_map['wmoid'].astype('string').fillna('-').astype(str).to_numpy() if 'wmoid' in df_map.columns else np.full(len(df_map), '-')
+
+            valid = ~(np.isnan(lats) | np.isnan(lons))
+
+            # Tambahkan markers TANPA clustering, radius tetap.
+            # Tuple-of-tuples supaya hashable sebagai cache key; HTML peta
+            # dibangun sekali di build_monthly_map_html lalu cache hit.
+            points = tuple(
+                (float(lat), float(lon), color,
+                 f"""
+                <div style="font-size:13px;">
+                <b>{station}</b><br>
+                <small>WMO: {wmoid}</small><br>
+                <small>Status: <strong>{status}</strong></small><br>
+                <small>Time diff: <code>{td}</code></small>
+                </div>
+                """)
+                for lat, lon, status, color, td, station, wmoid in zip(
+                    lats[valid], lons[valid], statuses[valid], colors[valid],
+                    td_strs[valid], stations[valid], wmoids[valid])
+            )
+
+            # render map full-width dari HTML hasil cache
+            map_html = build_monthly_map_html(points, (center_lat, center_lon))
+            components.html(map_html, height=620, scrolling=True)
         else:
-            components.html(m._repr_html_(), height=620, scrolling=True)
-    else:
-        st.info("Peta akan tampil jika sheet Monthly berisi kolom LAT, LON, dan status.")
+            st.info("Peta akan tampil jika sheet Monthly berisi kolom LAT, LON, dan status.")
+
+    render_map()
 
 
     # ---------- PIE CHARTS (baris di bawah peta): dua kolom kiri & kanan ----------
-    st.markdown("")  # spacing kecil
-    pie_left, pie_right = st.columns(2)
-
-    with pie_left:
-        st.subheader("Persentase Pengiriman")
-        if not df_monthly_norm.empty:
-            # Pie 1: Mengirim vs Tidak Mengirim
-            sent_series = df_monthly_norm["status"].apply(lambda s: "Mengirim" if s != "TIDAK MENGIRIM" else "Tidak Mengirim").value_counts()
-            df_sent = pd.DataFrame({"label": sent_series.index.astype(str), "count": sent_series.values})
-
-            color_map_sent = {"Mengirim": "#70B2B2", "Tidak Mengirim": "#E5E9C5"}
-            fig_sent = px.pie(df_sent, names="label", values="count", hole=0.4, color="label",
-                            color_discrete_map=color_map_sent)
-            fig_sent.update_traces(textinfo="percent+label", textposition="inside", insidetextorientation="radial")
-            fig_sent.update_layout(height=280, margin=dict(t=30, b=10, l=10, r=10))
-            st.plotly_chart(fig_sent, use_container_width=True)
-        else:
-            st.info("Tidak ada data untuk Pie 1.")
-
-    with pie_right:
-        st.subheader("Persentase Ketepatan Waktu")
-        if not df_monthly_norm.empty:
-            # Pie 2: Ketepatan Waktu (TEPAT WAKTU, TERLAMBAT, TIDAK MENGIRIM)
-            status_order = ["TEPAT WAKTU", "TERLAMBAT", "TIDAK MENGIRIM"]
-            status_series = df_monthly_norm["status"].value_counts().reindex(status_order).fillna(0)
-            df_status_pie = pd.DataFrame({"label": status_series.index.astype(str), "count": status_series.values})
-
-            color_map_status = {
-                "TEPAT WAKTU": "#35A29F",
-                "TERLAMBAT": "#0B666A",
-                "TIDAK MENGIRIM": "#071952"
-            }
-            fig_status = px.pie(df_status_pie, names="label", values="count", hole=0.4, color="label",
-                                color_discrete_map=color_map_status)
-            fig_status.update_traces(textinfo="percent+label", textposition="inside", insidetextorientation="radial")
-            fig_status.update_layout(height=280, margin=dict(t=30, b=10, l=10, r=10))
-            st.plotly_chart(fig_status, use_container_width=True)
-        else:
-            st.info("Tidak ada data untuk Pie 2.")
+    @st.fragment
+    def render_pies():
+        st.markdown("")  # spacing kecil
+        pie_left, pie_right = st.columns(2)
+
+        with pie_left:
+            st.subheader("Persentase Pengiriman")
+            if not df_monthly_norm.empty:
+                # Pie 1: Mengirim vs Tidak Mengirim (satu reduksi mask, tanpa apply per baris)
+                tidak_count = int((df_monthly_norm["status"] == "TIDAK MENGIRIM").sum())
+                mengirim_count = len(df_monthly_norm) - tidak_count
+                df_sent = pd.DataFrame({"label": ["Mengirim", "Tidak Mengirim"],
+                                        "count": [mengirim_count, tidak_count]})
+
+                color_map_sent = {"Mengirim": "#70B2B2", "Tidak Mengirim": "#E5E9C5"}
+                fig_sent = px.pie(df_sent, names="label", values="count", hole=0.4, color="label",
+                                color_discrete_map=color_map_sent)
+                fig_sent.update_traces(textinfo="percent+label", textposition="inside", insidetextorientation="radial")
+                fig_sent.update_layout(height=280, margin=dict(t=30, b=10, l=10, r=10))
+                st.plotly_chart(fig_sent, use_container_width=True)
+            else:
+                st.info("Tidak ada data untuk Pie 1.")
+
+        with pie_right:
+            st.subheader("Persentase Ketepatan Waktu")
+            if not df_monthly_norm.empty:
+                # Pie 2: Ketepatan Waktu (TEPAT WAKTU, TERLAMBAT, TIDAK MENGIRIM)
+                status_order = ["TEPAT WAKTU", "TERLAMBAT", "TIDAK MENGIRIM"]
+                status_series = df_monthly_norm["status"].value_counts().reindex(status_order).fillna(0)
+                df_status_pie = pd.DataFrame({"label": status_series.index.astype(str), "count": status_series.values})
+
+                color_map_status = {
+                    "TEPAT WAKTU": "#35A29F",
+                    "TERLAMBAT": "#0B666A",
+                    "TIDAK MENGIRIM": "#071952"
+                }
+                fig_status = px.pie(df_status_pie, names="label", values="count", hole=0.4, color="label",
+                                    color_discrete_map=color_map_status)
+                fig_status.update_traces(textinfo="percent+label", textposition="inside", insidetextorientation="radial")
+                fig_status.update_layout(height=280, margin=dict(t=30, b=10, l=10, r=10))
+                st.plotly_chart(fig_status, use_container_width=True)
+            else:
+                st.info("Tidak ada data untuk Pie 2.")
+
+    render_pies()
     # --------------------------
     # Render tabel per stasiun (FIX FINAL: ambil time_diff_hours dari df_monthly jika perlu; atur AgGrid)
     # --------------------------
     st.markdown("---")
     st.subheader("Tabel Data Per Stasiun")
 
-    def ensure_time_diff_from_source(df_norm: pd.DataFrame, df_src: pd.DataFrame) -> pd.DataFrame:
-        """
-        Pastikan kolom 'time_diff_hours' tersedia di df_norm:
-        - jika df_norm sudah punya, return langsung
-        - jika tidak, ambil dari df_src (sheet monthly) berdasarkan station_name,wmoid,report_month
-        """
-        if df_norm is None:
-            df_norm = pd.DataFrame()
-        if df_src is None:
-            df_src = pd.DataFrame()
-
-        df_out = df_norm.copy() if not df_norm.empty else pd.DataFrame()
-
-        # jika sudah ada column time_diff_hours di normalized, kita gunakan itu
-        if "time_diff_hours" in df_out.columns and df_out["time_diff_hours"].notna().any():
-            return df_out
-
-        # kalau tidak ada, ambil dari source df_src (asumsi df_src berisi kolom time_diff_hours asli)
-        if "time_diff_hours" not in df_out.columns and not df_src.empty:
-            # pilih kolom kunci untuk merge
-            key_cols = []
-            for k in ["station_name","wmoid","report_month"]:
-                if k in df_out.columns and k in df_src.columns:
-                    key_cols.append(k)
-            # jika df_out kosong (misalnya kita akan tunjukkan df_src langsung), set df_out = df_src subset
-            if df_out.empty:
-                # hanya ambil kolom yang relevan dari source
-                df_out = df_src.copy()
-            else:
-                # lakukan merge left untuk menambahkan time_diff_hours dari df_src jika ada
-                if key_cols:
-                    # ambil unique source columns
-                    src_cols = ["time_diff_hours"] + [c for c in key_cols if c in df_src.columns]
-                    src_unique = df_src[src_cols].drop_duplicates()
-                    try:
-                        df_out = df_out.merge(src_unique, on=key_cols, how="left", suffixes=("","_from_src"))
-                        # jika merge menghasilkan kolom time_diff_hours_from_src, gunakan yang itu jika original kosong
-                        if "time_diff_hours" not in df_out.columns and "time_diff_hours_from_src" in df_out.columns:
-                            df_out = df_out.rename(columns={"time_diff_hours_from_src":"time_diff_hours"})
-                        else:
-                            # jika kolom time_diff_hours ada tapi banyak NaN, fillna dari sumber
-                            if "time_diff_hours" in df_out.columns and "time_diff_hours_from_src" in df_out.columns:
-                                df_out["time_diff_hours"] = df_out["time_diff_hours"].fillna(df_out["time_diff_hours_from_src"])
-                                df_out = df_out.drop(columns=["time_diff_hours_from_src"])
-                    except Exception:
-                        # kalau merge gagal, fallback: tambahkan kolom time_diff_hours kosong
-                        if "time_diff_hours" not in df_out.columns:
-                            df_out["time_diff_hours"] = "-"
-                else:
-                    # tidak ada kolom kunci cocok -> fallback: tambahkan kolom dari src by index if lengths match
-                    if len(df_out) == len(df_src):
-                        df_out["time_diff_hours"] = df_src.get("time_diff_hours", pd.Series(["-"]*len(df_out))).values
-                    else:
-                        if "time_diff_hours" not in df_out.columns:
-                            df_out["time_diff_hours"] = "-"
-        # ensure column exists
-        if "time_diff_hours" not in df_out.columns:
-            df_out["time_diff_hours"] = "-"
-        return df_out
-
-    def prepare_display_df_for_table(df_norm: pd.DataFrame, df_src: pd.DataFrame) -> pd.DataFrame:
-        """
-        Siapkan DataFrame untuk ditampilkan:
-        - drop LAT,LON,time_diff_hours_num,tepat_waktu,monitoring_bulan
-        - pastikan time_diff_hours berasal dari source jika perlu
-        - rename header ke Bahasa Indonesia
-        """
-        if (df_norm is None or df_norm.empty) and (df_src is None or df_src.empty):
-            return pd.DataFrame()
-
-        # prefer df_norm, tapi gunakan df_src sebagai fallback
-        df_use = df_norm.copy() if not (df_norm is None or df_norm.empty) else df_src.copy()
-
-        # drop kolom yg tidak mau tampil
-        for c in ["LAT","LON","time_diff_hours_num","tepat_waktu","terkirim","monitoring_bulan"]:
-            if c in df_use.columns:
-                df_use = df_use.drop(columns=[c], errors='ignore')
-
-        # pastikan time_diff_hours muncul (ambil dari normalized atau source)
-        df_use = ensure_time_diff_from_source(df_use, df_src)
-
-        # susun kolom relevant
-        wanted = ["station_name","wmoid","report_month","status","received_at","time_diff_hours"]
-        cols_present = [c for c in wanted if c in df_use.columns]
-        other_cols = [c for c in df_use.columns if c not in cols_present]
-        df_res = df_use[cols_present + other_cols].copy()
-
-        # rename column ke bahasa indonesia
-        rename_map = {
-            "station_name":"Nama Stasiun",
-            "wmoid":"WMO ID",
-            "report_month":"Tahun-Bulan",
-            "status":"Status",
-            "received_at":"Diterima",
-            "time_diff_hours":"Time Diff (jam)"
-        }
-        df_res = df_res.rename(columns={k:v for k,v in rename_map.items() if k in df_res.columns})
-
-        return df_res
-
     # prepare display df: gunakan normalized dulu, source adalah df_monthly as original sheet
     df_display = prepare_display_df_for_table(df_monthly_norm if not df_monthly_norm.empty else pd.DataFrame(), df_monthly if not df_monthly.empty else pd.DataFrame())
 
+    # Split sekali lewat groupby atas Status kategorikal (compare kode integer),
+    # bukan tiga scan perbandingan string — satu pass untuk ketiga tab
+    if not df_display.empty and "Status" in df_display.columns:
+        df_display["Status"] = pd.Categorical(df_display["Status"], categories=["TEPAT WAKTU","TERLAMBAT","TIDAK MENGIRIM"])
+        status_groups = {k: g for k, g in df_display.groupby("Status", observed=True)}
+    else:
+        status_groups = {}
+    df_display_empty = df_display.iloc[:0]
+
+    # CSS tabel dipasang sekali untuk ketiga tab — tabel dirender lewat
+    # st.markdown di dokumen utama, tanpa iframe components.html per tab
+    st.markdown(_TABLE_CSS, unsafe_allow_html=True)
+
     tab1, tab2, tab3 = st.tabs(["Tepat Waktu","Terlambat","Tidak Mengirim"])
 
-    def render_table_html(df_show: pd.DataFrame, height: int = 420, table_id: str = "tbl"):
+    def render_table_html(df_show: pd.DataFrame, table_id: str = "tbl"):
         """
         Render DataFrame sebagai full-width HTML table dengan:
         - header sticky (freeze)
         - cell teks dapat wrap (tidak terpotong)
         - scroll vertical/horizontal
+        CSV bytes dan string HTML di-cache per fingerprint DataFrame sehingga
+        rerun tanpa perubahan data tidak menyerialisasi ulang.
         """
         if df_show is None or df_show.empty:
             st.info("Tidak ada data untuk ditampilkan.")
             return
 
-        # Tombol download CSV
-        csv_bytes = df_show.to_csv(index=False).encode("utf-8")
-        st.download_button("📥 Unduh CSV", data=csv_bytes, file_name=f"{table_id}.csv", mime="text/csv")
-
-        cols = list(df_show.columns)
-
-        # Build table head & body (escape teks)
-        thead_cells = "".join(f"<th>{html.escape(str(c))}</th>" for c in cols)
-        tbody_rows = []
-        for _, row in df_show.iterrows():
-            cells = []
-            for c in cols:
-                val = row[c]
-                cell_text = "" if pd.isna(val) else str(val)
-                cells.append(f"<td>{html.escape(cell_text)}</td>")
-            tbody_rows.append("<tr>" + "".join(cells) + "</tr>")
-        tbody_html = "\n".join(tbody_rows)
-
-        # Colgroup widths map — sesuaikan jika perlu
-        width_map = {
-            "Nama Stasiun": "40%",
-            "WMO ID": "8%",
-            "Bulan": "10%",
-            "Tahun-Bulan": "10%",
-            "Status": "12%",
-            "Diterima": "20%",
-            "Time Diff (jam)": "10%",
-            "time_diff_hours": "12%",
-        }
-        colgroup = "<colgroup>"
-        for c in cols:
-            w = width_map.get(c, "auto")
-            colgroup += f'<col style="width:{w}">'
-        colgroup += "</colgroup>"
-
-        css = f"""
-        <style>
-        /* container: fixed height, scroll inside */
-        .table-wrap-{table_id} {{
-            width: 100%;
-            max-width: 100%;
-            height: {height}px;
-            overflow: auto;
-            border: 1px solid #e6eef3;
-            border-radius: 6px;
-            background: #ffffff;
-        }}
-        table#{table_id} {{
-            width: 100%;
-            border-collapse: collapse;
-            table-layout: fixed; /* respect col widths but allow wrapping */
-            font-family: "Segoe UI", Roboto, Arial, sans-serif;
-        }}
-        table#{table_id} thead th {{
-            position: sticky;
-            top: 0;
-            background: #ffffff;
-            z-index: 5;
-            text-align: left;
-            padding: 12px 14px;
-            border-bottom: 1px solid #e6eef3;
-            font-weight: 600;
-            color: #243447;
-        }}
-        table#{table_id} tbody td {{
-            padding: 10px 14px;
-            border-bottom: 1px solid #f2f7fa;
-            /* allow wrapping and long-word break */
-            white-space: normal;
-            word-wrap: break-word;
-            overflow-wrap: anywhere;
-            hyphens: auto;
-            vertical-align: top;
-        }}
-        table#{table_id} tbody tr:nth-child(odd) {{
-            background: #fbfeff;
-        }}
-        table#{table_id} tbody tr:hover {{
-            background: #e8f6fb;
-        }}
-        /* Nama Stasiun prefer wide, but allow wrap if needed */
-        table#{table_id} td:first-child {{
-            min-width: 240px;
-            max-width: 60%;
-        }}
-        /* make other columns flexible */
-        table#{table_id} td:nth-child(2) {{ text-align:center; }}
-        /* small screens adjustments */
-        @media (max-width: 900px) {{
-            .table-wrap-{table_id} {{ height: {max(300, height//2)}px; }}
-            table#{table_id} thead th, table#{table_id} tbody td {{
-                padding: 8px;
-                font-size: 13px;
-            }}
-        }}
-        </style>
-        """
+        fingerprint = _table_fingerprint(df_show)
 
-        table_html = f"""
-        {css}
-        <div class="table-wrap-{table_id}">
-        <table id="{table_id}">
-            {colgroup}
-            <thead><tr>{thead_cells}</tr></thead>
-            <tbody>
-            {tbody_html}
-            </tbody>
-        </table>
-        </div>
-        """
+        # Tombol download CSV — callable: bytes baru dibuat (atau diambil dari
+        # cache) saat tombol diklik, bukan pada setiap rerun
+        st.download_button("📥 Unduh CSV", data=lambda: _csv_bytes(fingerprint, df_show), file_name=f"{table_id}.csv", mime="text/csv")
+
+        table_html = _monthly_table_html(fingerprint, df_show)
+        st.markdown(table_html, unsafe_allow_html=True)
 
-        # Render HTML with scrolling area
-        components.html(table_html, height=height+16, scrolling=True)
     with tab1:
-        df_tp = df_display[df_display["Status"] == "TEPAT WAKTU"]
-        render_table_html(df_tp, height=420, table_id="tp")
+        df_tp = status_groups.get("TEPAT WAKTU", df_display_empty)
+        render_table_html(df_tp, table_id="tp")
 
     with tab2:
-        df_tl = df_display[df_display["Status"] == "TERLAMBAT"]
-        render_table_html(df_tl, height=420, table_id="tl")
+        df_tl = status_groups.get("TERLAMBAT", df_display_empty)
+        render_table_html(df_tl, table_id="tl")
 
     with tab3:
-        df_nm = df_display[df_display["Status"] == "TIDAK MENGIRIM"]
-        render_table_html(df_nm, height=420, table_id="nm")
+        df_nm = status_groups.get("TIDAK MENGIRIM", df_display_empty)
+        render_table_html(df_nm, table_id="nm")
 
 # --------------------------
 #  HALAMAN TAHUNAN
@@ -1006,19 +1256,19 @@ else:
         df.columns = [str(c).strip().replace('\ufeff','') for c in df.columns]
         return df
 
+    def month_prefix_map(cols) -> dict:
+        """Peta prefix-3-huruf -> nama kolom asli (kemunculan pertama), satu pass."""
+        pref = {}
+        for c in cols:
+            pref.setdefault(str(c).strip()[:3].lower(), c)
+        return pref
+
     def detect_month_columns(cols):
         """Return month cols in order Jan..Des if present (keeps original column names)."""
-        res = []
-        for m in MONTH_ABBR:
-            # pick any column whose first 3 chars (after strip) match month abbr case-insensitive
-            for c in cols:
-                if str(c).strip()[:3].lower() == m[:3].lower():
-                    if c not in res:
-                        res.append(c)
-                        break
-        # also include any leftover columns that exactly match e.g. 'Bulan' or 'Jan-2025' forms
-        # but we prefer the ordered res above
-        return res
+        # satu pass membangun dict prefix, lalu lookup O(1) per bulan —
+        # menggantikan double-loop 12xN perbandingan string
+        pref = month_prefix_map(cols)
+        return [pref[m[:3].lower()] for m in MONTH_ABBR if m[:3].lower() in pref]
 
     # ========================
     # REKAP TAHUNAN NASIONAL
@@ -1033,15 +1283,13 @@ else:
             df_status = df_status.copy()
             df_status = clean_columns(df_status)
 
-            # Try to find LAT/LON column name variants
-            lat_col = None
-            lon_col = None
-            for c in df_status.columns:
-                cl = c.strip().lower()
-                if cl in ['lat','latitude','coord_lat','y'] or 'lat' == cl[:3]:
-                    lat_col = c
-                if cl in ['lon','lng','longitude','coord_lon','x'] or cl[:3] in ['lon','lng']:
-                    lon_col = c
+            # Try to find LAT/LON column name variants — satu pass vektor atas
+            # Index kolom, bukan loop Python per kolom di jalur repaint
+            cl = df_status.columns.str.strip().str.lower()
+            lat_idx = np.where(cl.isin(['lat','latitude','coord_lat','y']) | cl.str.startswith('lat'))[0]
+            lon_idx = np.where(cl.isin(['lon','lng','longitude','coord_lon','x']) | cl.str.startswith(('lon','lng')))[0]
+            lat_col = df_status.columns[lat_idx[0]] if len(lat_idx) else None
+            lon_col = df_status.columns[lon_idx[0]] if len(lon_idx) else None
             # fallback: common direct names
             lat_col = lat_col or ('LAT' if 'LAT' in df_status.columns else None)
             lon_col = lon_col or ('LON' if 'LON' in df_status.columns else None)
@@ -1049,9 +1297,15 @@ else:
             if not lat_col or not lon_col:
                 st.warning("Kolom koordinat (LAT / LON) tidak ditemukan. Nama kolom saat ini: " + ", ".join(df_status.columns))
             else:
-                # Normalize numeric format (replace comma decimal -> dot) and coerce
-                df_status[lat_col] = pd.to_numeric(df_status[lat_col].astype(str).str.replace(',','.'), errors='coerce')
-                df_status[lon_col] = pd.to_numeric(df_status[lon_col].astype(str).str.replace(',','.'), errors='coerce')
+                # Normalize numeric format (replace comma decimal -> dot) and coerce.
+                # Ganti koma hanya saat kolom belum numerik — reader pyarrow
+                # mengembalikan string[pyarrow] (bukan object), jadi cek dtype
+                # numerik; kalau sheet sudah numerik, skip alokasi string O(N)
+                for cc in (lat_col, lon_col):
+                    col = df_status[cc]
+                    if not pd.api.types.is_numeric_dtype(col):
+                        col = col.astype(str).str.replace(',', '.', regex=False)
+                    df_status[cc] = pd.to_numeric(col, errors='coerce')
                 # Rename to standard names for downstream code
                 df_status = df_status.rename(columns={lat_col: 'LAT', lon_col: 'LON'})
 
@@ -1071,48 +1325,57 @@ else:
                 if not bulan_cols:
                     st.warning("Kolom bulan (Jan..Des) tidak terdeteksi pada sheet Status. Kolom yg tersedia: " + ", ".join(df_status.columns))
                 else:
-                    # Normalize status text in month cells
-                    def norm_cell(x):
-                        if pd.isna(x):
-                            return ''
-                        s = str(x).strip().upper()
-                        # common normalization
-                        if 'TEPAT' in s:
-                            return 'TEPAT WAKTU'
-                        if 'TERLAMBAT' in s:
-                            return 'TERLAMBAT'
-                        if 'TIDAK' in s or 'TIDAK MENGIRIM' in s or 'MENGIRIM' not in s and ('-' in s or s=='' ):
-                            # preserve empty as not sending, but be conservative: only exact matches map
-                            if 'TIDAK MENGIRIM' in s or 'TIDAK' in s:
-                                return 'TIDAK MENGIRIM'
-                            return s
-                        # default: return original uppercase trimmed
-                        return s
-
-                    for c in bulan_cols:
-                        df_status[c] = df_status[c].apply(norm_cell)
-
-                    # compute counts per station
-                    def hitung(row, kata):
-                        return sum(1 for c in bulan_cols if str(row.get(c, '')).strip().upper() == kata)
-
-                    df_status['TEPAT_WAKTU'] = df_status.apply(lambda r: hitung(r, 'TEPAT WAKTU'), axis=1)
-                    df_status['TERLAMBAT'] = df_status.apply(lambda r: hitung(r, 'TERLAMBAT'), axis=1)
-                    df_status['TIDAK_MENGIRIM'] = df_status.apply(lambda r: hitung(r, 'TIDAK MENGIRIM'), axis=1)
-                    df_status['TOTAL'] = df_status[['TEPAT_WAKTU','TERLAMBAT','TIDAK_MENGIRIM']].sum(axis=1).replace(0, np.nan).fillna(0)
-                    df_status['pct_tepat'] = (df_status['TEPAT_WAKTU'] / df_status['TOTAL']).fillna(0)
-
-                    # Warna marker decision function (keputusan sama seperti spesifikasi)
-                    def color_hex(row):
-                        pct = float(row.get('pct_tepat', 0))
-                        terl, tdk = int(row.get('TERLAMBAT', 0)), int(row.get('TIDAK_MENGIRIM', 0))
-                        if pct >= 0.8:
-                            return '#2ecc71'
-                        if pct >= 0.3:
-                            return '#f1c40f'
-                        if pct < 0.3 and terl > tdk:
-                            return '#e74c3c'
-                        return '#000000'
+                    # Normalize status text in month cells — Series.str kernel C-level,
+                    # bukan fungsi Python per cell lewat apply
+                    def norm_cell_col(col: pd.Series) -> np.ndarray:
+                        s = col.astype('string').str.strip().str.upper()
+                        return np.select(
+                            [s.str.contains('TEPAT', na=False),
+                             s.str.contains('TERLAMBAT', na=False),
+                             s.str.contains('TIDAK', na=False)],
+                            ['TEPAT WAKTU', 'TERLAMBAT', 'TIDAK MENGIRIM'],
+                            default=s.fillna(''),
+                        )
+
+                    # Memo hasil normalisasi + matriks kode di session_state:
+                    # rerun widget dengan sheet yang sama cukup membaca ulang,
+                    # tidak mengulang str.contains + mapping per kolom
+                    sig = int(pd.util.hash_pandas_object(df_status[bulan_cols], index=False).sum())
+                    if st.session_state.get('_y2025_sig') != sig:
+                        for c in bulan_cols:
+                            df_status[c] = norm_cell_col(df_status[c])
+                        st.session_state['_y2025_sig'] = sig
+                        st.session_state['_y2025_norm'] = df_status[bulan_cols].copy()
+                        st.session_state['_y2025_code_mat'] = status_code_matrix(df_status, bulan_cols)
+                    else:
+                        df_status[bulan_cols] = st.session_state['_y2025_norm'].to_numpy()
+
+                    # compute counts per station — matriks kode int8, satu broadcast
+                    # per kategori, bukan N lambda call per baris lewat apply(axis=1)
+                    code_mat = st.session_state['_y2025_code_mat']
+                    df_status['TEPAT_WAKTU'] = (code_mat == 2).sum(axis=1).astype(np.int32)
+                    df_status['TERLAMBAT'] = (code_mat == 1).sum(axis=1).astype(np.int32)
+                    df_status['TIDAK_MENGIRIM'] = (code_mat == 0).sum(axis=1).astype(np.int32)
+                    # Penjumlahan numpy langsung — tanpa frame 3-kolom sementara,
+                    # axis-1 reducer pandas, dan round-trip replace/fillna
+                    tot = (df_status['TEPAT_WAKTU'].to_numpy()
+                           + df_status['TERLAMBAT'].to_numpy()
+                           + df_status['TIDAK_MENGIRIM'].to_numpy())
+                    df_status['TOTAL'] = tot
+                    df_status['pct_tepat'] = np.divide(
+                        df_status['TEPAT_WAKTU'].to_numpy(), tot,
+                        out=np.zeros(len(tot), dtype=float), where=tot != 0)
+
+                    # Warna marker sekali jalan lewat np.select (keputusan sama
+                    # seperti spesifikasi), bukan dua call fungsi per baris
+                    pct_arr = df_status['pct_tepat'].to_numpy(dtype=float)
+                    terl_arr = df_status['TERLAMBAT'].to_numpy()
+                    tdk_arr = df_status['TIDAK_MENGIRIM'].to_numpy()
+                    df_status['_color'] = np.select(
+                        [pct_arr >= 0.8, pct_arr >= 0.3, (pct_arr < 0.3) & (terl_arr > tdk_arr)],
+                        ['#2ecc71', '#f1c40f', '#e74c3c'],
+                        default='#000000'
+                    )
 
                     # --- PETA ESRI ---
                     import folium
@@ -1132,45 +1395,44 @@ else:
                         center_lat, center_lon = -2.2331, 117.2841
 
                     m = Map(location=[center_lat, center_lon], zoom_start=5,
-                            tiles='https://server.arcgisonline.com/ArcGIS/rest/services/World_Street_Map/MapServer/tile/{z}/{y}/{x}',
-                            attr='Esri')
+                            tiles=ESRI_TILES, attr='Esri')
+
+                    # Proyeksikan kolom yang dipakai lalu itertuples — tuple polos
+                    # per baris, bukan Series seperti iterrows()
+                    # itertuples membuang nama kolom berawalan underscore, jadi
+                    # kolom warna di-rename dulu
+                    df_markers = df_status[['LAT','LON','TEPAT_WAKTU','TERLAMBAT','TIDAK_MENGIRIM','_color']].rename(columns={'_color': 'marker_color'})
+                    df_markers['station_name'] = df_status['station_name'] if 'station_name' in df_status.columns else ''
+                    df_markers['wmoid'] = df_status['wmoid'] if 'wmoid' in df_status.columns else ''
+                    df_markers = df_markers.dropna(subset=['LAT','LON'])
+
+                    # Popup HTML dirakit vektor sekali untuk semua baris —
+                    # bukan f-string + int() per iterasi loop marker
+                    df_markers['popup'] = (
+                        '<b>' + df_markers['station_name'].astype(str) + '</b><br>'
+                        'WMO: ' + df_markers['wmoid'].astype(str) + '<br>'
+                        'Tepat Waktu: ' + df_markers['TEPAT_WAKTU'].astype(str) + '<br>'
+                        'Terlambat: ' + df_markers['TERLAMBAT'].astype(str) + '<br>'
+                        'Tidak Mengirim: ' + df_markers['TIDAK_MENGIRIM'].astype(str)
+                    )
 
                     marker_coords = []
-                    for _, r in df_status.iterrows():
-                        if pd.isna(r['LAT']) or pd.isna(r['LON']):
-                            continue
-                        popup_html = f"""
-                        <b>{r.get('station_name','')}</b><br>
-                        WMO: {r.get('wmoid','')}<br>
-                        Tepat Waktu: {int(r['TEPAT_WAKTU'])}<br>
-                        Terlambat: {int(r['TERLAMBAT'])}<br>
-                        Tidak Mengirim: {int(r['TIDAK_MENGIRIM'])}
-                        """
+                    for r in df_markers.itertuples(index=False):
+                        color = r.marker_color
                         CircleMarker(
-                            location=[r['LAT'], r['LON']],
+                            location=[r.LAT, r.LON],
                             radius=7,
-                            color=color_hex(r),
-                            fill=True, fill_color=color_hex(r), fill_opacity=0.9,
-                            popup=Popup(popup_html, max_width=250)
+                            color=color,
+                            fill=True, fill_color=color, fill_opacity=0.9,
+                            popup=Popup(r.popup, max_width=250)
                         ).add_to(m)
-                        marker_coords.append((r['LAT'], r['LON']))
+                        marker_coords.append((r.LAT, r.LON))
 
                     if marker_coords:
                         m.fit_bounds(marker_coords, padding=(30,30))
 
                     # Legend
-                    legend_html = """
-                    <div style="position:absolute;top:10px;right:10px;z-index:9999;
-                                background:rgba(255,255,255,0.95);padding:8px;border-radius:6px;
-                                border:1px solid #ddd;font-size:13px;">
-                        <b>Keterangan</b><br>
-                        <span style="background:#2ecc71;width:12px;height:12px;display:inline-block;margin-right:6px;"></span> ≥80% Tepat Waktu<br>
-                        <span style="background:#f1c40f;width:12px;height:12px;display:inline-block;margin-right:6px;"></span> 30–79% Tepat Waktu<br>
-                        <span style="background:#e74c3c;width:12px;height:12px;display:inline-block;margin-right:6px;"></span> <30% (Terlambat > Tidak)<br>
-                        <span style="background:#000;width:12px;height:12px;display:inline-block;margin-right:6px;"></span> <30% (Terlambat ≤ Tidak)
-                    </div>
-                    """
-                    m.get_root().html.add_child(folium.Element(legend_html))
+                    m.get_root().html.add_child(folium.Element(LEGEND_YEARLY_HTML))
                     components.html(m._repr_html_(), height=680, scrolling=False)
 
                     # --- DIAGRAM BATANG + PIE CHART ---
@@ -1180,23 +1442,28 @@ else:
                     st.markdown("### Diagram Batang per Bulan (Januari—Desember)")
 
                     # Build df_bulan ensuring order Jan..Des even if some months missing
+                    # Hitung jumlah per bulan langsung dari matriks kode int8 —
+                    # satu reduksi kolom per kategori, tanpa str.upper ulang atas
+                    # data yang sudah dinormalisasi
+                    tepat_m = (code_mat == 2).sum(axis=0)
+                    terl_m = (code_mat == 1).sum(axis=0)
+                    tidak_m = (code_mat == 0).sum(axis=0)
+                    total_m = tepat_m + terl_m + tidak_m
+                    denom = np.where(total_m > 0, total_m, 1)
+
+                    col_idx = {c: i for i, c in enumerate(bulan_cols)}
+                    bulan_pref = month_prefix_map(bulan_cols)
                     df_bulan_rows = []
                     for m in MONTH_ABBR:
-                        if m in bulan_cols:
-                            col = m
-                        else:
-                            # find actual column that contains same 3-letter code
-                            col = next((c for c in bulan_cols if c.strip()[:3].lower() == m[:3].lower()), None)
-                        if col:
-                            tepat = (df_status[col].str.upper() == 'TEPAT WAKTU').sum()
-                            terlambat = (df_status[col].str.upper() == 'TERLAMBAT').sum()
-                            tidak = (df_status[col].str.upper() == 'TIDAK MENGIRIM').sum()
-                            total = tepat + terlambat + tidak
+                        # lookup O(1) di dict prefix, bukan scan bulan_cols per bulan
+                        col = bulan_pref.get(m[:3].lower())
+                        if col is not None:
+                            i = col_idx[col]
                             df_bulan_rows.append({
                                 'Bulan': m,
-                                'Tepat Waktu': 100*tepat/total if total>0 else 0,
-                                'Terlambat': 100*terlambat/total if total>0 else 0,
-                                'Tidak Mengirim': 100*tidak/total if total>0 else 0
+                                'Tepat Waktu': 100*tepat_m[i]/denom[i],
+                                'Terlambat': 100*terl_m[i]/denom[i],
+                                'Tidak Mengirim': 100*tidak_m[i]/denom[i]
                             })
                         else:
                             # month not present in sheet -> append zeros
@@ -1266,29 +1533,38 @@ else:
                 st.warning("Gagal mendeteksi kolom bulan (Jan..Des) di sheet Status. Kolom tersedia: " + ", ".join(df_st.columns))
                 st.stop()
 
-            # Normalize month values -> canonical statuses
-            def norm_status_cell(x):
-                if pd.isna(x):
-                    return ''
-                s = str(x).strip().upper()
-                if 'TEPAT' in s:
-                    return 'TEPAT WAKTU'
-                if 'TERLAMBAT' in s:
-                    return 'TERLAMBAT'
-                if 'TIDAK' in s or 'TIDAK MENGIRIM' in s:
-                    return 'TIDAK MENGIRIM'
-                if s in ['', '-', 'N/A', 'NA']:
-                    return 'TIDAK MENGIRIM'
-                return s
-
-            for c in month_cols:
-                df_st[c] = df_st[c].apply(norm_status_cell)
-
-            # Compute counts per station
+            # Normalize month values -> canonical statuses (vectorized Series.str,
+            # tanpa apply per cell)
+            def norm_status_col(col: pd.Series) -> np.ndarray:
+                s = col.astype('string').str.strip().str.upper()
+                return np.select(
+                    [s.isna(),
+                     s.str.contains('TEPAT', na=False),
+                     s.str.contains('TERLAMBAT', na=False),
+                     s.str.contains('TIDAK', na=False) | s.isin(['', '-', 'N/A', 'NA'])],
+                    ['', 'TEPAT WAKTU', 'TERLAMBAT', 'TIDAK MENGIRIM'],
+                    default=s.fillna(''),
+                )
+
+            # Memo di session_state, kunci hash isi kolom bulan — sama seperti
+            # halaman Monitoring 2025, rerun widget tidak menormalisasi ulang
+            sig = int(pd.util.hash_pandas_object(df_st[month_cols], index=False).sum())
+            if st.session_state.get('_perf_sig') != sig:
+                for c in month_cols:
+                    df_st[c] = norm_status_col(df_st[c])
+                st.session_state['_perf_sig'] = sig
+                st.session_state['_perf_norm'] = df_st[month_cols].copy()
+                st.session_state['_perf_code_mat'] = status_code_matrix(df_st, month_cols)
+            else:
+                df_st[month_cols] = st.session_state['_perf_norm'].to_numpy()
+
+            # Compute counts per station dari matriks kode int8 (satu pass,
+            # tanpa tiga DataFrame boolean intermediate dari apply)
+            code_mat = st.session_state['_perf_code_mat']
             df_counts = pd.DataFrame({
-                'TEPAT_WAKTU': df_st[month_cols].apply(lambda col: col == 'TEPAT WAKTU').sum(axis=1),
-                'TERLAMBAT': df_st[month_cols].apply(lambda col: col == 'TERLAMBAT').sum(axis=1),
-                'TIDAK_MENGIRIM': df_st[month_cols].apply(lambda col: col == 'TIDAK MENGIRIM').sum(axis=1)
+                'TEPAT_WAKTU': (code_mat == 2).sum(axis=1),
+                'TERLAMBAT': (code_mat == 1).sum(axis=1),
+                'TIDAK_MENGIRIM': (code_mat == 0).sum(axis=1)
             })
             # ensure ints
             for c in ['TEPAT_WAKTU', 'TERLAMBAT', 'TIDAK_MENGIRIM']:
@@ -1299,14 +1575,11 @@ else:
             df_perf = pd.concat([df_st.reset_index(drop=True), df_counts.reset_index(drop=True)], axis=1)
 
             # ----- NEW: handle duplicate column names -----
-            # detect duplicates
-            dup_mask = df_perf.columns.duplicated(keep=False)
+            # satu mask duplicated(keep='last') saja: deteksi sekaligus subset
+            # posisional, tanpa pass kedua dan list comprehension
+            dup_mask = df_perf.columns.duplicated(keep='last')
             if dup_mask.any():
-                dup_cols = [c for i,c in enumerate(df_perf.columns) if dup_mask[i]]
-                # show debug info in sidebar to help diagnose (can be removed later)
-                # st.sidebar.warning(f"Terdeteksi kolom duplikat di df_perf: {dup_cols}. Duplikat akan dihapus dan kolom terakhir dipertahankan.")
-                # keep last occurrence for each duplicated column name
-                df_perf = df_perf.loc[:, ~df_perf.columns.duplicated(keep='last')]
+                df_perf = df_perf.iloc[:, ~dup_mask]
 
             # compute pct_tepat vectorized (safe)
             # ensure numeric types for counts
@@ -1315,7 +1588,11 @@ else:
                     df_perf[c] = pd.to_numeric(df_perf[c], errors='coerce').fillna(0).astype(int)
 
             if 'TEPAT_WAKTU' in df_perf.columns and 'TOTAL' in df_perf.columns:
-                df_perf['pct_tepat'] = df_perf['TEPAT_WAKTU'].astype(float).div(df_perf['TOTAL'].replace({0: np.nan})).fillna(0)
+                # divisi ter-mask satu pass — tanpa Series sementara dari
+                # replace({0: nan}) + div + fillna
+                t = df_perf['TEPAT_WAKTU'].to_numpy(dtype=np.float64)
+                tot = df_perf['TOTAL'].to_numpy(dtype=np.float64)
+                df_perf['pct_tepat'] = np.divide(t, tot, out=np.zeros_like(t), where=tot > 0)
             else:
                 df_perf['pct_tepat'] = 0.0
 
@@ -1331,6 +1608,10 @@ else:
             # Default sort: pct_tepat descending
             df_perf = df_perf.sort_values(by='pct_tepat', ascending=False).reset_index(drop=True)
 
+            # Lowercase sekali di sini; filter pencarian per keystroke tinggal
+            # substring find C-level (regex=False) tanpa astype+lower ulang
+            df_perf['_station_lower'] = df_perf[display_station_col].astype(str).str.lower()
+
             # --- UI: filters & pagination ---
             left_col, right_col = st.columns([3,1])
             with left_col:
@@ -1340,122 +1621,157 @@ else:
 
             df_filtered = df_perf.copy()
             if search_text.strip():
-                mask = df_filtered[display_station_col].astype(str).str.contains(search_text.strip(), case=False, na=False)
+                mask = df_filtered['_station_lower'].str.contains(search_text.strip().lower(), regex=False, na=False)
                 df_filtered = df_filtered[mask]
 
             if only_with_data:
                 df_filtered = df_filtered[df_filtered['TOTAL'] > 0]
 
+            # Downcast sebelum jalur render/hash/CSV: jumlah bulanan muat di
+            # unsigned kecil dan pct cukup float32 — byte yang dipindah ke
+            # to_csv/fingerprint/loop render berkurang sekitar separuh
+            for c in ['TEPAT_WAKTU', 'TERLAMBAT', 'TIDAK_MENGIRIM', 'TOTAL']:
+                if c in df_filtered.columns:
+                    df_filtered[c] = pd.to_numeric(df_filtered[c], downcast='unsigned')
+            if 'pct_tepat' in df_filtered.columns:
+                df_filtered['pct_tepat'] = df_filtered['pct_tepat'].astype('float32')
+            if display_station_col in df_filtered.columns:
+                df_filtered[display_station_col] = df_filtered[display_station_col].astype('category')
+
             total_items = len(df_filtered)
             if total_items == 0:
                 st.info("Tidak ada stasiun yang cocok dengan filter.")
                 st.stop()
 
-            per_page = st.selectbox("Chart per halaman", options=[6,9,12,15,18,24], index=4, help="Jumlah pie chart per halaman")
-            total_pages = max(1, math.ceil(total_items / per_page))
-            page = st.number_input(f"Halaman (1..{total_pages})", min_value=1, max_value=total_pages, value=1, step=1)
-
-            start_idx = (page - 1) * per_page
-            end_idx = min(start_idx + per_page, total_items)
-            subset = df_filtered.iloc[start_idx:end_idx]
-
-            st.markdown(f"Menampilkan stasiun **{start_idx+1}**–**{end_idx}** dari **{total_items}** hasil filter.")
+            # Fingerprint hasil filter dihitung sekali dan dipakai ulang sebagai
+            # kunci widget halaman ini — frame tidak di-hash ulang per widget,
+            # dan nomor halaman otomatis reset saat hasil filter berubah
+            df_filtered_key = int(pd.util.hash_pandas_object(df_filtered.head(50), index=False).sum())
 
             # --- Render pie-chart grid ---
-            ncols = 3
-            rows = math.ceil(len(subset) / ncols)
-            for r in range(rows):
-                cols = st.columns(ncols)
-                for ci in range(ncols):
-                    idx = r * ncols + ci
-                    if idx >= len(subset):
-                        cols[ci].empty()
-                        continue
-                    row = subset.iloc[idx]
-                    station_label = row.get(display_station_col, f"Stasiun {start_idx + idx + 1}")
-                    wmoid = row.get('wmoid', '-')
-                    vals = [int(row['TEPAT_WAKTU']), int(row['TERLAMBAT']), int(row['TIDAK_MENGIRIM'])]
-                    labels = ['Tepat Waktu', 'Terlambat', 'Tidak Mengirim']
-                    df_tmp = pd.DataFrame({'Kategori': labels, 'Jumlah': vals})
-
-                    # --- Improved: wrap station name into lines and use <br> only (Plotly-safe) ---
-                    def wrap_text_for_title(s: str, max_chars: int = 40) -> str:
-                        """
-                        Wrap text by inserting <br> at whitespace so the title fits in two (or more) lines.
-                        Keeps words intact and prefers splitting at a space before max_chars.
-                        """
-                        s = str(s).strip()
-                        if len(s) <= max_chars:
-                            return s
-                        parts = []
-                        words = s.split()
-                        current = ""
-                        for w in words:
-                            if current == "":
-                                current = w
-                            elif len(current) + 1 + len(w) <= max_chars:
-                                current = current + " " + w
-                            else:
-                                parts.append(current)
-                                current = w
-                        if current:
-                            parts.append(current)
-                        return "<br>".join(parts)
-
-                    # build wrapped title (Plotly accepts <br> for newlines)
-                    wrapped_title = wrap_text_for_title(station_label, max_chars=42)
-                    title_text = f"{wrapped_title}<br>WMOID: {wmoid}"
-
-                    # prepare data
-                    df_tmp = pd.DataFrame({'Kategori': labels, 'Jumlah': vals})
-
-                    fig = px.pie(
-                        df_tmp,
-                        names='Kategori',
-                        values='Jumlah',
-                        color='Kategori',
-                        color_discrete_map={
-                            'Tepat Waktu': '#35A29F',
-                            'Terlambat': '#0B666A',
-                            'Tidak Mengirim': '#071952'
-                        },
-                        hole=0.42
-                    )
-
-                    # show percent inside donut and hover shows counts
-                    fig.update_traces(
-                        textinfo='percent',
-                        textposition='inside',
-                        insidetextorientation='radial',
-                        hovertemplate="%{label}: %{value} (%.1f%%)<extra></extra>",
-                        marker=dict(line=dict(color='white', width=1.5))
-                    )
-
-                    # Set title using only <br> (safe). Increase top margin & height for wrap.
-                    fig.update_layout(
-                        title={'text': title_text, 'x': 0.5, 'xanchor': 'center', 'yanchor': 'top'},
-                        title_font=dict(size=13),
-                        margin=dict(t=88, b=10, l=8, r=8),
-                        height=320,
-                        showlegend=False,
-                        uniformtext_minsize=10,
-                        uniformtext_mode='hide'
-                    )
+            import plotly.graph_objects as go
+
+            # Layout bersama untuk semua pie: divalidasi Plotly sekali di sini,
+            # bukan 6 kali per chart lewat update_layout — hanya title yang
+            # berbeda antar chart
+            pie_layout_template = go.layout.Template(layout=go.Layout(
+                title=dict(x=0.5, xanchor='center', yanchor='top'),
+                title_font_size=13,
+                margin=dict(t=88, b=10, l=8, r=8),
+                height=320,
+                showlegend=False,
+                uniformtext_minsize=10,
+                uniformtext_mode='hide',
+            ))
+
+            # Figure di-cache per (stasiun, counts): rerun/klik pagination dengan
+            # data yang sama tinggal mengambil dict figure dari cache, tanpa
+            # membangun ulang px.pie + update_traces/update_layout per chart
+            @st.cache_data(max_entries=512, show_spinner=False)
+            def _build_station_pie(wmoid, tepat, terlambat, tidak, station_label) -> dict:
+                # build wrapped title (Plotly accepts <br> for newlines)
+                wrapped_title = wrap_text_for_title(station_label, max_chars=42)
+                title_text = f"{wrapped_title}<br>WMOID: {wmoid}"
+
+                # go.Pie langsung — lewati pipeline validasi/long-form px.pie,
+                # yang untuk donut 3 slice justru mendominasi biaya per chart
+                fig = go.Figure(data=[go.Pie(
+                    labels=['Tepat Waktu', 'Terlambat', 'Tidak Mengirim'],
+                    values=[tepat, terlambat, tidak],
+                    marker_colors=['#35A29F', '#0B666A', '#071952'],
+                    hole=0.42,
+                    textinfo='percent',
+                    textposition='inside',
+                    insidetextorientation='radial',
+                    hovertemplate="%{label}: %{value} (%{percent:.1%})<extra></extra>",
+                    marker_line_color='white',
+                    marker_line_width=1.5
+                )],
+                # Title pakai <br> saja (aman); sisanya ikut template bersama
+                layout=dict(template=pie_layout_template,
+                            title=dict(text=title_text)))
+                return fig.to_dict()
+
+            # Thumbnail PNG statis: sekali render via kaleido per (stasiun,
+            # counts), selanjutnya browser cuma terima bytes gambar — tanpa
+            # spec JSON ~30KB dan tanpa kerja JS Plotly per chart. Kunci cache
+            # sama dengan _build_station_pie. None = kaleido tidak tersedia,
+            # grid jatuh kembali ke chart interaktif
+            @st.cache_data(max_entries=512, show_spinner=False)
+            def _pie_png(wmoid, tepat, terlambat, tidak, station_label):
+                fig = go.Figure(_build_station_pie(wmoid, tepat, terlambat, tidak, station_label))
+                try:
+                    return fig.to_image(format='png', width=320, height=320, scale=1)
+                except Exception:
+                    return None
+
+            # Fragment: interaksi widget lain di halaman (search,
+            # checkbox, tab) tidak merender ulang grid — hanya widget
+            # pagination di dalam fragment yang memicu eksekusi ulang
+            @st.fragment
+            def _render_pie_grid():
+                per_page = st.selectbox("Chart per halaman", options=[6,9,12,15,18,24], index=4, help="Jumlah pie chart per halaman", key="perf_per_page")
+                use_static_thumbnails = st.checkbox("Thumbnail statis (PNG)", value=False, help="Render pie sebagai gambar PNG — jauh lebih ringan di browser, tanpa hover/interaksi", key="perf_static_thumbs")
+                total_pages = max(1, math.ceil(total_items / per_page))
+                page = st.number_input(f"Halaman (1..{total_pages})", min_value=1, max_value=total_pages, value=1, step=1, key=f"perf_page_{df_filtered_key}")
+
+                start_idx = (page - 1) * per_page
+                end_idx = min(start_idx + per_page, total_items)
+                subset = df_filtered.iloc[start_idx:end_idx]
+
+                st.markdown(f"Menampilkan stasiun **{start_idx+1}**–**{end_idx}** dari **{total_items}** hasil filter.")
+
+                # Tarik kolom jadi ndarray sekali (SoA) — loop chart tinggal indeks
+                # array, tanpa materialisasi pd.Series lewat .iloc[idx] per baris
+                tw = subset['TEPAT_WAKTU'].to_numpy(dtype=np.int64)
+                tl = subset['TERLAMBAT'].to_numpy(dtype=np.int64)
+                tm = subset['TIDAK_MENGIRIM'].to_numpy(dtype=np.int64)
+                if display_station_col in subset.columns:
+                    labels_arr = subset[display_station_col].to_numpy(dtype=object)
+                else:
+                    labels_arr = np.array([f"Stasiun {start_idx + i + 1}" for i in range(len(subset))], dtype=object)
+                if 'wmoid' in subset.columns:
+                    wmo_arr = subset['wmoid'].to_numpy(dtype=object)
+                else:
+                    wmo_arr = np.full(len(subset), '-', dtype=object)
+
+                ncols = 3
+                rows = math.ceil(len(subset) / ncols)
+                for r in range(rows):
+                    cols = st.columns(ncols)
+                    for ci in range(ncols):
+                        idx = r * ncols + ci
+                        if idx >= len(subset):
+                            cols[ci].empty()
+                            continue
+                        if use_static_thumbnails:
+                            png = _pie_png(
+                                str(wmo_arr[idx]), int(tw[idx]), int(tl[idx]),
+                                int(tm[idx]), str(labels_arr[idx]))
+                            if png is not None:
+                                cols[ci].image(png, use_container_width=True)
+                                continue
+                        fig = go.Figure(_build_station_pie(
+                            str(wmo_arr[idx]), int(tw[idx]), int(tl[idx]),
+                            int(tm[idx]), str(labels_arr[idx])))
+                        cols[ci].plotly_chart(fig, use_container_width=True)
 
-                    cols[ci].plotly_chart(fig, use_container_width=True)
 
 
 
+            _render_pie_grid()
 
             # --- Download CSV result (filtered full table) ---
             csv_cols = [display_station_col, 'wmoid', 'TEPAT_WAKTU', 'TERLAMBAT', 'TIDAK_MENGIRIM', 'TOTAL', 'pct_tepat']
             available_csv_cols = [c for c in csv_cols if c in df_filtered.columns]
-            csv_bytes = df_filtered[available_csv_cols].to_csv(index=False).encode('utf-8')
-            st.download_button("📥 Download Performa Stasiun (CSV hasil filter)", data=csv_bytes, file_name="Performa_Stasiun_filtered.csv", mime="text/csv")
+            # data callable: CSV baru diserialisasi saat tombol diklik, bukan tiap rerun
+            st.download_button("📥 Download Performa Stasiun (CSV hasil filter)", data=lambda: df_filtered[available_csv_cols].to_csv(index=False).encode('utf-8'), file_name="Performa_Stasiun_filtered.csv", mime="text/csv")
 
             # optional: show small summary table below charts (first 20 rows)
+            # Invariant: slice baris dulu, proyeksi kolom belakangan — row-slice
+            # itu view murah, proyeksi kolom lebar di frame penuh bisa copy besar
             st.markdown("**Ringkasan (top rows)**")
-            st.dataframe(df_filtered[available_csv_cols].head(20), height=260)
+            st.dataframe(df_filtered.head(20)[available_csv_cols], height=260)
 
 
 
@@ -1468,6 +1784,12 @@ else:
         with tab1:
             st.markdown(" ")
 
+            # Di-cache per fingerprint sheet: ganti tab / widget lain tidak
+            # mengulang clean + parse regex + rename selama df_delta sama.
+            # Hash konten penuh (max_entries=4, tetap murah) — hash head(50)
+            # saja bisa melewatkan update sheet di baris bawah
+            @st.cache_data(show_spinner=False, max_entries=4,
+                           hash_funcs={pd.DataFrame: _table_fingerprint})
             def _prepare_delta_display_local(df_src: pd.DataFrame) -> pd.DataFrame:
                 """
                 Robust prepare:
@@ -1490,7 +1812,7 @@ else:
                 # detect month-like original columns (preserve original names)
                 month_like_cols = [c for c in df.columns if str(c).strip()[:3].title() in MONTH_ABBR]
                 if not month_like_cols:
-                    month_like_cols = [c for c in df.columns if any(m[:3].lower() in str(c).lower() for m in MONTH_ABBR)]
+                    month_like_cols = [c for c in df.columns if str(c).strip()[:3].lower() in MONTH_PREFIXES]
 
                 # if none -> just rename station/wmoid and return
                 if not month_like_cols:
@@ -1513,7 +1835,7 @@ else:
                 for orig in month_like_cols:
                     col_hrs = f"{orig}_hrs"
                     try:
-                        df[col_hrs] = df[orig].apply(parse_delta_to_hours)
+                        df[col_hrs] = parse_delta_column(df[orig])
                     except Exception:
                         df[col_hrs] = np.nan
                     hrs_map[orig] = col_hrs
@@ -1568,21 +1890,14 @@ else:
                             if src_info:
                                 orig_col = src_info[0]  # original textual column name
                                 if orig_col in df.columns:
-                                    # create simplified textual representation: try extract first number (days/hours)
-                                    def simplify_text_cell(x):
-                                        if pd.isna(x):
-                                            return ""
-                                        s = str(x).strip()
-                                        # try to extract a leading number (possibly negative) with optional decimal
-                                        mnum = re.search(r"(-?\d+(\.\d+)?)", s)
-                                        if mnum:
-                                            return mnum.group(1)
-                                        # fallback: return first short token (max 12 chars)
-                                        toks = s.split()
-                                        return (toks[0][:12] if toks else "")
-                                    df_res[m] = df_res[orig_col].apply(lambda v: simplify_text_cell(v) if pd.isna(df_res.at[df_res.index[df_res.index.get_loc(0) if len(df_res.index)>0 else 0], m]) else df_res[m])
-                                    # note: above is safe filler; simpler approach: fillna with simplified text
-                                    df_res[m] = df_res[m].fillna(df[orig_col].apply(simplify_text_cell))
+                                    # simplified textual representation, vektor:
+                                    # angka pertama via str.extract, fallback token
+                                    # pertama (max 12 char) — setara simplify per
+                                    # cell tapi tanpa apply + lookup .at per baris
+                                    src = df[orig_col].astype('string').str.strip()
+                                    num = src.str.extract(_RE_NUM, expand=False)
+                                    first_tok = src.str.split().str[0].str[:12]
+                                    df_res[m] = df_res[m].fillna(num.fillna(first_tok).fillna(""))
 
                 # Try convert month columns to numeric where possible (keeps text if not numeric)
                 for m in MONTH_ABBR:
@@ -1616,127 +1931,42 @@ else:
             # st.sidebar.write("raw df_delta columns:", list(df_delta.columns))
             # st.sidebar.write("sample df_delta head:", df_delta.head(3))
 
-            def _render_table_html_delta(df_show: pd.DataFrame, height: int = 420, table_id: str = "delta_tbl_local"):
-                """Render DeltaHours table with word-wrap, sticky header and wider month columns.
-                Robust to cell values that are Series/arrays by picking first element safely.
-                """
-                if df_show is None or df_show.empty:
-                    st.info("Tidak ada data untuk ditampilkan.")
-                    return
-
-                # download button for the displayed table
-                csv_bytes = df_show.to_csv(index=False).encode("utf-8")
-                st.download_button("📥 Unduh DeltaHours CSV (tabel tampil)", data=csv_bytes, file_name=f"{table_id}.csv", mime="text/csv")
-
-                cols = list(df_show.columns)
-
-                # mark which columns are month columns (everything after Nama Stasiun and WMO ID)
-                month_start_idx = 2 if (len(cols) >= 2 and cols[0] == 'Nama Stasiun' and cols[1] == 'WMO ID') else 2
-                month_cols_set = set(cols[month_start_idx:])  # treat these as month columns
-
-                thead_cells = ""
-                for i, c in enumerate(cols):
-                    cls = "month" if c in month_cols_set else "sticky"
-                    thead_cells += f'<th class="{cls}">{html.escape(str(c))}</th>'
-
-                tbody_rows = []
-                for _, row in df_show.iterrows():
-                    cells = []
-                    for c in cols:
-                        # safe access: row[c] can be scalar OR Series if duplicate column names exist.
-                        val = row[c]
-                        # If val is Series / ndarray / list -> pick first non-null element (robust)
-                        if isinstance(val, pd.Series):
-                            if not val.empty:
-                                # prefer first non-null
-                                nonnull = val.dropna()
-                                val = nonnull.iloc[0] if not nonnull.empty else val.iloc[0]
-                            else:
-                                val = np.nan
-                        elif isinstance(val, (list, tuple, np.ndarray)):
-                            try:
-                                # convert to iterable and pick first non-null
-                                arr = [x for x in val if not (x is None or (isinstance(x, float) and np.isnan(x)) or (isinstance(x, str) and x.strip()==''))]
-                                val = arr[0] if arr else (val[0] if len(val)>0 else np.nan)
-                            except Exception:
-                                val = np.nan
-
-                        # now val should be scalar (or np.nan)
-                        if pd.isna(val):
-                            cell_text = ""
-                        else:
-                            # format numeric month values with 1 decimal if float
-                            if c in month_cols_set and isinstance(val, (float, int, np.floating, np.integer)):
-                                try:
-                                    cell_text = f"{float(val):.1f}"
-                                except Exception:
-                                    cell_text = str(val)
-                            else:
-                                cell_text = str(val)
-
-                        cell_cls = "month" if c in month_cols_set else ""
-                        cells.append(f'<td class="{cell_cls}">{html.escape(cell_text)}</td>')
-                    tbody_rows.append("<tr>" + "".join(cells) + "</tr>")
-
-                tbody_html = "\n".join(tbody_rows)
-
-                # colgroup: Nama Stasiun wide, WMO ID medium, months flexible
-                colgroup = "<colgroup>"
-                for i, c in enumerate(cols):
-                    if c == 'Nama Stasiun':
-                        colgroup += '<col style="width:38%">'
-                    elif c == 'WMO ID':
-                        colgroup += '<col style="width:8%">'
-                    else:
-                        colgroup += '<col style="width:auto">'
-                colgroup += "</colgroup>"
-
-                css = f"""
-                <style>
-                .table-wrap-{table_id} {{
-                    width:100%; max-width:100%; height:{height}px; overflow:auto;
-                    border:1px solid #e6eef3; border-radius:6px; background:#fff;
-                }}
-                table#{table_id} {{ width:100%; border-collapse:collapse; table-layout:auto; font-family:Segoe UI, Roboto, Arial; }}
-                table#{table_id} thead th {{
-                    position:sticky; top:0; background:#fff; z-index:5; text-align:left; padding:10px 12px;
-                    border-bottom:1px solid #e6eef3; font-weight:600; color:#243447; white-space:normal;
-                }}
-                table#{table_id} thead th.month {{ text-align:center; }}
-                table#{table_id} tbody td {{
-                    padding:8px 12px; border-bottom:1px solid #f2f7fa; white-space:normal; word-wrap:break-word; overflow-wrap:anywhere; vertical-align:top;
-                }}
-                table#{table_id} tbody td.month {{ text-align:center; min-width:90px; }} /* make month columns wider */
-                table#{table_id} tbody tr:nth-child(odd) {{ background:#fbfeff; }}
-                table#{table_id} tbody tr:hover {{ background:#e8f6fb; }}
-                table#{table_id} td:first-child, table#{table_id} thead th:first-child {{ min-width:320px; max-width:48%; }}
-                table#{table_id} td:nth-child(2), table#{table_id} thead th:nth-child(2) {{ min-width:100px; text-align:center; }}
-                @media (max-width:900px) {{
-                    .table-wrap-{table_id} {{ height:{max(240, height//2)}px; }}
-                    table#{table_id} thead th, table#{table_id} tbody td {{ padding:6px; font-size:13px; }}
-                    table#{table_id} tbody td.month {{ min-width:60px; }}
-                }}
-                </style>
-                """
-
-                table_html = f"""{css}<div class="table-wrap-{table_id}">{colgroup}<table id="{table_id}"><thead><tr>{thead_cells}</tr></thead><tbody>{tbody_html}</tbody></table></div>"""
-                components.html(table_html, height=height+18, scrolling=True)
-
-
             # ---- run prepare + render ----
+            # st.dataframe (Glide, virtualized): hanya baris terlihat yang
+            # dirender di client — tanpa string HTML O(N baris) + iframe
             if not df_delta.empty:
                 df_prepared = _prepare_delta_display_local(df_delta)
-                _render_table_html_delta(df_prepared, height=420, table_id="delta_yearly_local")
+                # jam delta cuma butuh 1 desimal — float32 cukup
+                for m in MONTH_ABBR:
+                    if m in df_prepared.columns and pd.api.types.is_numeric_dtype(df_prepared[m]):
+                        df_prepared[m] = df_prepared[m].astype('float32')
+                if df_prepared.empty:
+                    st.info("Tidak ada data untuk ditampilkan.")
+                else:
+                    st.download_button("📥 Unduh DeltaHours CSV (tabel tampil)",
+                                       data=lambda: df_prepared.to_csv(index=False).encode("utf-8"),
+                                       file_name="delta_yearly_local.csv", mime="text/csv")
+                    col_cfg = {m: st.column_config.NumberColumn(format="%.1f")
+                               for m in MONTH_ABBR
+                               if m in df_prepared.columns and pd.api.types.is_numeric_dtype(df_prepared[m])}
+                    col_cfg["Nama Stasiun"] = st.column_config.TextColumn(width="large")
+                    col_cfg["WMO ID"] = st.column_config.TextColumn(width="small")
+                    st.dataframe(df_prepared, height=420, use_container_width=True,
+                                 column_config=col_cfg)
             else:
                 st.info("DeltaHours sheet belum tersedia.")
 
             # fallback raw download
-            st.download_button("📥 Download DeltaHours CSV (raw)", data=df_delta.to_csv(index=False), file_name="DeltaHours.csv")
+            st.download_button("📥 Download DeltaHours CSV (raw)", data=lambda: df_delta.to_csv(index=False), file_name="DeltaHours.csv")
 
 
         with tab2:
             st.markdown(" ")
 
+            # Cache dengan kunci fingerprint konten penuh, sama seperti tab
+            # DeltaHours — perubahan di baris mana pun mengubah kuncinya
+            @st.cache_data(show_spinner=False, max_entries=4,
+                           hash_funcs={pd.DataFrame: _table_fingerprint})
             def _prepare_status_display_local(df_src: pd.DataFrame) -> pd.DataFrame:
                 """
                 Prepare status table:
@@ -1749,7 +1979,8 @@ else:
                 if df_src is None or df_src.empty:
                     return pd.DataFrame()
 
-                df = clean_columns(df_src.copy())
+                # clean_columns sudah meng-copy; copy tambahan di sini mubazir
+                df = clean_columns(df_src)
 
                 # drop coords to reduce width
                 for c in ['LAT', 'LON']:
@@ -1759,7 +1990,7 @@ else:
                 # detect month-like columns (preserve original names)
                 month_like_cols = [c for c in df.columns if str(c).strip()[:3].title() in MONTH_ABBR]
                 if not month_like_cols:
-                    month_like_cols = [c for c in df.columns if any(m[:3].lower() in str(c).lower() for m in MONTH_ABBR)]
+                    month_like_cols = [c for c in df.columns if str(c).strip()[:3].lower() in MONTH_PREFIXES]
 
                 # map month base -> first matching original col (stable)
                 month_map = {}
@@ -1769,18 +2000,18 @@ else:
                         month_map[base] = orig
 
                 # build result dataframe selecting only needed cols
-                df_res = df.copy()
                 cols_keep = []
-                if 'station_name' in df_res.columns:
+                if 'station_name' in df.columns:
                     cols_keep.append('station_name')
-                if 'wmoid' in df_res.columns:
+                if 'wmoid' in df.columns:
                     cols_keep.append('wmoid')
                 for m in MONTH_ABBR:
-                    if m in month_map and month_map[m] in df_res.columns:
+                    if m in month_map and month_map[m] in df.columns:
                         cols_keep.append(month_map[m])
 
                 # if no months found, still return station + wmoid
-                df_res = df_res[cols_keep].copy()
+                # proyeksi kolom pada frame lebar langsung — tanpa copy penuh dulu
+                df_res = df[cols_keep].copy()
 
                 # rename station/wmoid and month source cols to canonical names
                 rename_map = {}
@@ -1806,7 +2037,8 @@ else:
                     if m in df_res.columns:
                         cols_order.append(m)
                 remaining = [c for c in df_res.columns if c not in cols_order]
-                df_res = df_res[cols_order + remaining].copy()
+                # proyeksi kolom sudah menghasilkan frame baru — .copy() mubazir
+                df_res = df_res[cols_order + remaining]
 
                 # Remove duplicate column names keeping first
                 df_res = df_res.loc[:, ~df_res.columns.duplicated(keep='first')]
@@ -1820,112 +2052,37 @@ else:
 
                 return df_res
 
-            def _render_table_html_status(df_show: pd.DataFrame, height: int = 420, table_id: str = "status_tbl_local"):
-                """
-                Render Status table: sticky header, Nama Stasiun wide, WMO ID center, months center with larger min-width.
-                Handles Series/list cell values by picking first non-null element.
-                """
-                if df_show is None or df_show.empty:
-                    st.info("Tidak ada data untuk ditampilkan.")
-                    return
-
-                # download button for displayed table
-                csv_bytes = df_show.to_csv(index=False).encode("utf-8")
-                st.download_button("📥 Unduh Status CSV (tabel tampil)", data=csv_bytes, file_name=f"{table_id}.csv", mime="text/csv")
-
-                cols = list(df_show.columns)
-                # treat everything after Nama Stasiun & WMO ID as month columns
-                month_start_idx = 2 if (len(cols) >= 2 and cols[0] == 'Nama Stasiun' and cols[1] == 'WMO ID') else 2
-                month_cols_set = set(cols[month_start_idx:])
-
-                thead_cells = ""
-                for i, c in enumerate(cols):
-                    cls = "month" if c in month_cols_set else "sticky"
-                    thead_cells += f'<th class="{cls}">{html.escape(str(c))}</th>'
-
-                tbody_rows = []
-                for _, row in df_show.iterrows():
-                    cells = []
-                    for c in cols:
-                        val = row[c]
-                        # safe handling if val is Series / list / ndarray
-                        if isinstance(val, pd.Series):
-                            if not val.empty:
-                                nonnull = val.dropna()
-                                val = nonnull.iloc[0] if not nonnull.empty else val.iloc[0]
-                            else:
-                                val = np.nan
-                        elif isinstance(val, (list, tuple, np.ndarray)):
-                            try:
-                                arr = [x for x in val if not (x is None or (isinstance(x, float) and np.isnan(x)) or (isinstance(x, str) and x.strip() == ''))]
-                                val = arr[0] if arr else (val[0] if len(val) > 0 else np.nan)
-                            except Exception:
-                                val = np.nan
-
-                        if pd.isna(val):
-                            cell_text = ""
-                        else:
-                            # keep textual status as-is, short if very long
-                            s = str(val).strip()
-                            # optional: collapse multi-line into single line
-                            cell_text = " ".join(s.split())
-                        cell_cls = "month" if c in month_cols_set else ""
-                        cells.append(f'<td class="{cell_cls}">{html.escape(cell_text)}</td>')
-                    tbody_rows.append("<tr>" + "".join(cells) + "</tr>")
-
-                tbody_html = "\n".join(tbody_rows)
-
-                # colgroup: Nama Stasiun wide, WMO ID medium, months flexible
-                colgroup = "<colgroup>"
-                for i, c in enumerate(cols):
-                    if c == 'Nama Stasiun':
-                        colgroup += '<col style="width:38%">'
-                    elif c == 'WMO ID':
-                        colgroup += '<col style="width:8%">'
+            # ---- run prepare + render for Status tab ----
+            # Fragment: prepare + tabel + tombol download hanya dieksekusi
+            # ulang oleh interaksi di dalam tab ini, bukan oleh widget lain
+            # di halaman (search, radio sub-page, dsb.)
+            @st.fragment
+            def _status_tab(df_status):
+                # sama seperti tab DeltaHours: tabel virtualized, bukan HTML custom
+                if not df_status.empty:
+                    df_status_prepared = _prepare_status_display_local(df_status)
+                    if df_status_prepared.empty:
+                        st.info("Tidak ada data untuk ditampilkan.")
                     else:
-                        colgroup += '<col style="width:auto">'
-                colgroup += "</colgroup>"
-
-                css = f"""
-                <style>
-                .table-wrap-{table_id} {{
-                    width:100%; max-width:100%; height:{height}px; overflow:auto;
-                    border:1px solid #e6eef3; border-radius:6px; background:#fff;
-                }}
-                table#{table_id} {{ width:100%; border-collapse:collapse; table-layout:auto; font-family:Segoe UI, Roboto, Arial; }}
-                table#{table_id} thead th {{
-                    position:sticky; top:0; background:#fff; z-index:5; text-align:left; padding:10px 12px;
-                    border-bottom:1px solid #e6eef3; font-weight:600; color:#243447; white-space:normal;
-                }}
-                table#{table_id} thead th.month {{ text-align:center; }}
-                table#{table_id} tbody td {{
-                    padding:8px 12px; border-bottom:1px solid #f2f7fa; white-space:normal; word-wrap:break-word; overflow-wrap:anywhere; vertical-align:top;
-                }}
-                table#{table_id} tbody td.month {{ text-align:center; min-width:120px; }} /* month columns slightly wider for readability */
-                table#{table_id} tbody tr:nth-child(odd) {{ background:#fbfeff; }}
-                table#{table_id} tbody tr:hover {{ background:#e8f6fb; }}
-                table#{table_id} td:first-child, table#{table_id} thead th:first-child {{ min-width:320px; max-width:48%; }}
-                table#{table_id} td:nth-child(2), table#{table_id} thead th:nth-child(2) {{ min-width:100px; text-align:center; }}
-                @media (max-width:900px) {{
-                    .table-wrap-{table_id} {{ height:{max(240, height//2)}px; }}
-                    table#{table_id} thead th, table#{table_id} tbody td {{ padding:6px; font-size:13px; }}
-                    table#{table_id} tbody td.month {{ min-width:80px; }}
-                }}
-                </style>
-                """
-
-                table_html = f"""{css}<div class="table-wrap-{table_id}">{colgroup}<table id="{table_id}"><thead><tr>{thead_cells}</tr></thead><tbody>{tbody_html}</tbody></table></div>"""
-                components.html(table_html, height=height+18, scrolling=True)
+                        st.download_button("📥 Unduh Status CSV (tabel tampil)",
+                                           data=lambda: df_status_prepared.to_csv(index=False).encode("utf-8"),
+                                           file_name="status_yearly_local.csv", mime="text/csv")
+                        st.dataframe(df_status_prepared, height=420, use_container_width=True,
+                                     column_config={
+                                         "Nama Stasiun": st.column_config.TextColumn(width="large"),
+                                         "WMO ID": st.column_config.TextColumn(width="small"),
+                                     })
+                else:
+                    st.info("Status sheet belum tersedia.")
 
-            # ---- run prepare + render for Status tab ----
-            if not df_status.empty:
-                df_status_prepared = _prepare_status_display_local(df_status)
-                _render_table_html_status(df_status_prepared, height=420, table_id="status_yearly_local")
-            else:
-                st.info("Status sheet belum tersedia.")
+                # raw download fallback — callable + cache per fingerprint:
+                # serialisasi baru jalan saat diklik, klik berulang memakai
+                # bytes hasil cache, dan payload dikirim sebagai CSV gzip
+                st.download_button("📥 Download Status CSV (raw, gzip)",
+                                   data=lambda: _csv_gz_bytes(_table_fingerprint(df_status), df_status),
+                                   file_name="Status.csv.gz", mime="application/gzip")
 
-            # raw download fallback
-            st.download_button("📥 Download Status CSV (raw)", data=df_status.to_csv(index=False), file_name="Status.csv")
+            _status_tab(df_status)
 
 # Footer
 st.markdown("---")
@@ -1,24 +1,13 @@
 import streamlit as st
-import base64
-import os
 
-def setup_header():
-    current_script_path = os.path.abspath(__file__)
-    
-    # Dapatkan folder tempat skrip ini berada (.../data23/utils)
-    utils_folder = os.path.dirname(current_script_path)
-    
-    # Dapatkan folder induknya (ini adalah folder dataset Anda, misal .../data23)
-    base_dataset_folder = os.path.dirname(utils_folder)
-    
-    # Gabungkan path folder induk dengan nama file logo Anda
-    logo_path = os.path.join(base_dataset_folder, "Logo_BMKG.png")
-    
-    # --- SELESAI BLOK TAMBAHAN ---
-    with open(logo_path, "rb") as f:
-        logo_base64 = base64.b64encode(f.read()).decode()
+# Logo disajikan dari folder static/ (server.enableStaticServing) —
+# browser men-cache file PNG-nya sekali, dan HTML header tidak lagi
+# membawa data URI base64 yang ~33% lebih besar dari file aslinya
+LOGO_URL = "app/static/Logo_BMKG.png"
 
-    st.markdown(f"""
+# HTML header dirakit sekali saat import — isinya sepenuhnya statis,
+# jadi setiap rerun tinggal mengirim string yang sama ke st.markdown
+_HEADER_HTML = f"""
     <style>
         .header-container {{
             display: flex;
@@ -37,7 +26,7 @@ def setup_header():
         .header-text h4 {{
             margin: 0;
             color: #1f4e79;
-            line-height: 1; 
+            line-height: 1;
         }}
         .header-text h6 {{
             margin: 0;
@@ -48,11 +37,15 @@ def setup_header():
     </style>
 
     <div class="header-container">
-        <img src="data:image/png;base64,{logo_base64}" alt="BMKG Logo">
+        <img src="{LOGO_URL}" alt="BMKG Logo">
         <div class="header-text">
             <h4>Dashboard Monitoring Sandi CLIMAT</h4>
             <h6>Tim Kerja Manajemen Observasi Meteorologi Permukaan</h6>
         </div>
     </div>
     <hr>
-    """, unsafe_allow_html=True)
+    """
+
+
+def setup_header():
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)